@@ -0,0 +1,55 @@
+import numpy as np
+from settings import *
+
+# Area abilities resolved against a whole EntityStore at once. A range test
+# is a single squared-distance mask over the store's position arrays, the
+# affected entities are removed in bulk and their effect particles are
+# spawned as one burst, so cost grows with array length rather than with
+# Python-level work per target.
+class AbilityEngine:
+    def __init__(self, store, grid, particles):
+        self.store = store
+        self.grid = grid
+        self.particles = particles
+
+    def in_range(self, x, y, radius, mask=None):
+        # Rows whose reference point lies strictly inside the circle,
+        # optionally limited to rows where `mask` (a store field) is set
+        n = self.store.count
+        dx = self.store.x[:n] - x
+        dy = self.store.y[:n] - y
+        hit = dx * dx + dy * dy < radius * radius
+        if mask is not None:
+            hit &= mask[:n]
+        return np.flatnonzero(hit)
+
+    def burst(self, rows, color, per_target, size, speed):
+        # One effect burst centred on each target, emitted as a single batch
+        offset_x, offset_y = self.store.center_offset
+        self.particles.emit_burst(
+            np.repeat(self.store.x[rows] + offset_x, per_target),
+            np.repeat(self.store.y[rows] + offset_y, per_target),
+            color,
+            len(rows) * per_target,
+            size,
+            speed
+        )
+
+    def remove(self, rows):
+        for row in rows.tolist():
+            self.grid.remove(self.store.views[row])
+        self.store.remove_rows(rows)
+
+    def scan(self, x, y, radius):
+        # Q-Scan: highlight every bug in range; returns how many
+        rows = self.in_range(x, y, radius)
+        self.store.highlighted[rows] = True
+        return len(rows)
+
+    def fix(self, x, y, radius):
+        # Q-Fix: remove every highlighted bug in range; returns how many
+        rows = self.in_range(x, y, radius, self.store.highlighted)
+        if len(rows):
+            self.burst(rows, NEON_GREEN, 20, (3, 8), (1, 3))
+            self.remove(rows)
+        return len(rows)
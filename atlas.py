@@ -0,0 +1,148 @@
+import numpy as np
+import pygame
+from settings import *
+
+# Data byte pulse values run from -0.1 to 1.1 in steps of 0.1 (see
+# DataByteStore.update); one pre-rendered frame per step
+PULSE_STEP = 0.1
+PULSE_FRAMES = 13
+# Bug glitch offsets run from -3 to 3 (see BugStore.update)
+GLITCH_RANGE = 3
+
+# Colorkey of opaque atlases; no entity is drawn in pure black
+TRANSPARENT = (0, 0, 0)
+
+# Sprite sheet packed from individually drawn surfaces. Sprites are packed
+# into rows (shelves) of one surface and handed out as subsurfaces. Opaque
+# atlases use a run-length encoded colorkey instead of per-pixel alpha,
+# which blits several times faster.
+class SpriteAtlas:
+    def __init__(self, alpha=True, width=512):
+        self.alpha = alpha
+        self.width = width
+        self.pending = []
+        self.surface = None
+
+    def add(self, surface):
+        # Returns a slot index; the sprite is available after pack()
+        self.pending.append(surface)
+        return len(self.pending) - 1
+
+    def pack(self):
+        positions = []
+        x = y = shelf = 0
+        for surface in self.pending:
+            w, h = surface.get_size()
+            if x + w > self.width:
+                x = 0
+                y += shelf
+                shelf = 0
+            positions.append((x, y, w, h))
+            x += w
+            shelf = max(shelf, h)
+
+        size = (self.width, y + shelf)
+        if self.alpha:
+            sheet = pygame.Surface(size, pygame.SRCALPHA)
+        else:
+            sheet = pygame.Surface(size)
+            sheet.fill(TRANSPARENT)
+        if pygame.display.get_surface() is not None:
+            sheet = sheet.convert_alpha() if self.alpha else sheet.convert()
+        for surface, rect in zip(self.pending, positions):
+            sheet.blit(surface, rect[:2])
+
+        sprites = []
+        for rect in positions:
+            sprite = sheet.subsurface(rect)
+            if not self.alpha:
+                sprite.set_colorkey(TRANSPARENT, pygame.RLEACCEL)
+            sprites.append(sprite)
+        self.surface = sheet
+        self.pending = []
+        return sprites
+
+# Every entity visual of the gameplay screen, drawn once: data byte pulse
+# frames, bug variants by highlight and glitch offset, and the player by
+# facing and glow. Each group shares one anchor: the offset from an
+# entity's (x, y) to its sprite's top-left corner. Data bytes and plain
+# bugs go into an opaque atlas; highlighted bugs (antialiased text) and the
+# player (translucent glow) into one with per-pixel alpha.
+#
+# With a `scale` below 1 every sprite and anchor is shrunk by it, for
+# drawing the scene at a reduced render resolution (QUALITY_TIERS).
+class EntityAtlas:
+    def __init__(self, text, scale=1.0):
+        self.text = text
+        self.scale = scale
+        opaque = SpriteAtlas(alpha=False)
+        blended = SpriteAtlas()
+
+        radius = int(DATA_BYTE_SIZE + (PULSE_FRAMES - 1) * PULSE_STEP * 3) + 1
+        self.data_byte_anchor = (-radius * scale, -radius * scale)
+        byte_slots = [opaque.add(self._scaled(self._data_byte(frame, radius))) for frame in range(PULSE_FRAMES)]
+
+        self.bug_anchor = (-GLITCH_RANGE, -20)
+        glitches = range(-GLITCH_RANGE, GLITCH_RANGE + 1)
+        plain_slots = [opaque.add(self._scaled(self._bug(False, glitch))) for glitch in glitches]
+        highlighted_slots = [blended.add(self._scaled(self._bug(True, glitch))) for glitch in glitches]
+
+        self.player_anchor = (-10 * scale, -10 * scale)
+        player_keys = [(direction, glow) for direction in (-1, 1) for glow in (False, True)]
+        player_slots = [blended.add(self._scaled(self._player(direction, glow))) for direction, glow in player_keys]
+        # _bug() draws relative to the unscaled anchor
+        self.bug_anchor = (self.bug_anchor[0] * scale, self.bug_anchor[1] * scale)
+
+        opaque_sprites = opaque.pack()
+        blended_sprites = blended.pack()
+        self.sheets = (opaque, blended)
+        self.data_bytes = [opaque_sprites[slot] for slot in byte_slots]
+        self.bugs = ([opaque_sprites[slot] for slot in plain_slots] +
+                     [blended_sprites[slot] for slot in highlighted_slots])
+        self.players = {key: blended_sprites[slot] for key, slot in zip(player_keys, player_slots)}
+
+    def _scaled(self, sprite):
+        if self.scale == 1:
+            return sprite
+        width, height = sprite.get_size()
+        return pygame.transform.smoothscale(sprite, (max(1, round(width * self.scale)),
+                                                     max(1, round(height * self.scale))))
+
+    def _data_byte(self, frame, radius):
+        size = DATA_BYTE_SIZE + (frame - 1) * PULSE_STEP * 3
+        sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, NEON_BLUE, (radius, radius), size)
+        pygame.draw.circle(sprite, WHITE, (radius, radius), size/2)
+        return sprite
+
+    def _bug(self, highlighted, glitch):
+        # Drawn relative to bug_anchor, so the body moves with the glitch
+        # and the error symbol stays put
+        left, top = -self.bug_anchor[0], -self.bug_anchor[1]
+        sprite = pygame.Surface((BUG_WIDTH + GLITCH_RANGE * 2, top + BUG_HEIGHT + GLITCH_RANGE), pygame.SRCALPHA)
+        body = (left + glitch, top + glitch, BUG_WIDTH, BUG_HEIGHT)
+        pygame.draw.rect(sprite, NEON_PURPLE if highlighted else RED, body)
+        if highlighted:
+            pygame.draw.rect(sprite, WHITE, body, 2)
+            error_text = self.text.render('small', "!", True, WHITE)
+            sprite.blit(error_text, (left + BUG_WIDTH/2 - error_text.get_width()/2, 0))
+        return sprite
+
+    def _player(self, direction, glow):
+        sprite = pygame.Surface((PLAYER_WIDTH + 20, PLAYER_HEIGHT + 20), pygame.SRCALPHA)
+        pygame.draw.rect(sprite, NEON_GREEN, (10, 10, PLAYER_WIDTH, PLAYER_HEIGHT))
+        eye_size = 8
+        eye_offset_x = 15 if direction > 0 else 5
+        pygame.draw.circle(sprite, WHITE, (10 + eye_offset_x, 30), eye_size)
+        pygame.draw.circle(sprite, WHITE, (10 + PLAYER_WIDTH - eye_offset_x, 30), eye_size)
+        if glow:
+            overlay = pygame.Surface((PLAYER_WIDTH + 20, PLAYER_HEIGHT + 20), pygame.SRCALPHA)
+            pygame.draw.rect(overlay, (0, 255, 140, 50), (10, 10, PLAYER_WIDTH, PLAYER_HEIGHT), border_radius=5)
+            sprite.blit(overlay, (0, 0))
+        return sprite
+
+    def pulse_frames(self, pulse):
+        return np.clip(np.rint(pulse / PULSE_STEP).astype(np.intp) + 1, 0, PULSE_FRAMES - 1)
+
+    def bug_variants(self, highlighted, glitch):
+        return highlighted.astype(np.intp) * (GLITCH_RANGE * 2 + 1) + glitch + GLITCH_RANGE
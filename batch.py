@@ -0,0 +1,155 @@
+import os
+
+# Workers run headless; select the dummy driver before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import ast
+import csv
+import itertools
+import math
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from settings import *
+
+# Mass headless playthroughs. Every (seed, policy, parameter combination)
+# is one job; jobs are split into chunks and spread over a process pool,
+# and each finished chunk is appended to the results file straight away.
+#
+#   python batch.py --runs 200 --policy greedy \
+#       --param PLAYER_SPEED=6,8,10 --param Q_SCAN_RANGE=300,400 \
+#       --out results.parquet
+
+BASE_COLUMNS = ['seed', 'policy', 'outcome', 'frames', 'time', 'bugs_fixed', 'score', 'health']
+
+OUTCOMES = {
+    GAMEPLAY: 'timeout',
+    LEVEL_COMPLETE: 'complete',
+    GAME_OVER: 'crashed'
+}
+
+# One runner per worker process, reused across jobs
+_runner = None
+
+def run_chunk(jobs, max_frames):
+    global _runner
+    from headless import HeadlessRunner, apply_overrides
+    from policies import POLICIES
+
+    if _runner is None:
+        _runner = HeadlessRunner()
+
+    rows = []
+    for seed, policy, params in jobs:
+        apply_overrides(params)
+        _runner.input.reset()
+        frames = _runner.run(max_frames, POLICIES[policy], seed)
+
+        manager = _runner.manager
+        player = manager.states[GAMEPLAY].player
+        row = {
+            'seed': seed,
+            'policy': policy,
+            'outcome': OUTCOMES[manager.current_state],
+            'frames': frames,
+            'time': frames // FPS,
+            'bugs_fixed': manager.game_data['bugs_fixed'],
+            'score': manager.game_data['score'],
+            'health': player.health
+        }
+        row.update(params)
+        rows.append(row)
+    return rows
+
+class CsvResultWriter:
+    def __init__(self, path, columns):
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.DictWriter(self.file, fieldnames=columns)
+        self.writer.writeheader()
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class ParquetResultWriter:
+    # Columnar output; every finished chunk becomes one row group
+    def __init__(self, path, columns):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            sys.exit("Writing .parquet results requires pyarrow (pip install pyarrow)")
+        self.pa = pyarrow
+        self.path = path
+        self.columns = columns
+        self.writer = None
+
+    def write(self, rows):
+        table = self.pa.table({column: [row[column] for row in rows] for column in self.columns})
+        if self.writer is None:
+            self.writer = self.pa.parquet.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+def open_writer(path, columns):
+    if path.endswith('.parquet'):
+        return ParquetResultWriter(path, columns)
+    return CsvResultWriter(path, columns)
+
+def parse_param(text):
+    name, _, values = text.partition('=')
+    if not values:
+        raise argparse.ArgumentTypeError(f"Expected NAME=v1,v2,... but got {text!r}")
+    return name, [ast.literal_eval(value) for value in values.split(',')]
+
+def build_jobs(runs, base_seed, policy, grid):
+    names = [name for name, _ in grid]
+    jobs = []
+    for combo in itertools.product(*(values for _, values in grid)):
+        params = dict(zip(names, combo))
+        for run in range(runs):
+            jobs.append((base_seed + run, policy, params))
+    return jobs
+
+def main():
+    parser = argparse.ArgumentParser(description="Run seeded headless playthroughs in parallel")
+    parser.add_argument('--runs', type=int, default=100, help="Seeded runs per parameter combination")
+    parser.add_argument('--seed', type=int, default=0, help="First seed")
+    parser.add_argument('--policy', default='greedy')
+    parser.add_argument('--param', type=parse_param, action='append', default=[],
+                        help="Setting to sweep, e.g. PLAYER_SPEED=6,8,10 (repeatable)")
+    parser.add_argument('--max-frames', type=int, default=FPS * 120)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--chunk', type=int, default=0, help="Jobs per task (default: auto)")
+    parser.add_argument('--out', default='results.csv', help=".csv or .parquet")
+    args = parser.parse_args()
+
+    jobs = build_jobs(args.runs, args.seed, args.policy, args.param)
+    chunk = args.chunk or max(1, math.ceil(len(jobs) / (args.workers * 4)))
+    columns = BASE_COLUMNS + [name for name, _ in args.param]
+    writer = open_writer(args.out, columns)
+
+    start = time.perf_counter()
+    done = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(run_chunk, jobs[i:i + chunk], args.max_frames)
+                   for i in range(0, len(jobs), chunk)]
+        for future in as_completed(futures):
+            rows = future.result()
+            writer.write(rows)
+            done += len(rows)
+            print(f"\r{done}/{len(jobs)} runs", end='', flush=True)
+    writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\n{len(jobs)} runs in {elapsed:.1f}s ({len(jobs) / elapsed:.1f} runs/s) -> {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+# Benchmark suite for the game's hot paths, run without a window through
+# SDL's dummy video driver. Every case is timed at each entity count and the
+# results are written as JSON, so runs from different releases can be
+# compared with --compare.
+#
+#   python benchmarks/run.py [--counts 10 1000 100000] [--only gameplay]
+#                            [--out results.json] [--compare baseline.json]
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import math
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pygame
+import settings
+from entities import BugStore, DataByteStore
+from headless import HeadlessRunner, apply_overrides
+from particles import ParticleSystem
+from rng import RandomStreams
+from settings import *
+
+# Entities per screen-sized sector with the default level profile
+ENTITIES_PER_SECTOR = (LEVEL_PROFILES[LEVEL_PROFILE]['bytes_per_sector'] +
+                       LEVEL_PROFILES[LEVEL_PROFILE]['bugs_per_sector'])
+
+def measure(fn, repeat, target=0.02):
+    # Milliseconds per call for `repeat` batches, each batch running long
+    # enough (about `target` seconds) to swamp timer resolution
+    start = time.perf_counter()
+    fn()
+    single = time.perf_counter() - start
+    number = max(1, int(target / max(single, 1e-9)))
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) * 1000 / number)
+    return samples
+
+# Cases: each takes an entity count and returns (entities, callable)
+
+def particles_update(count):
+    particles = ParticleSystem(rng=np.random.default_rng(0))
+    particles.emit_burst(WIDTH / 2, HEIGHT / 2, NEON_BLUE, count, (2, 5), 0.0)
+    # Particles never expire and stay put, so every call does the same work
+    particles.lifetime[:count] = np.iinfo(np.int16).max
+    return len(particles), particles.update
+
+def particles_draw(count):
+    particles = ParticleSystem(rng=np.random.default_rng(0))
+    particles.emit_burst(np.random.default_rng(1).uniform(0, WIDTH, count),
+                         np.random.default_rng(2).uniform(0, HEIGHT, count),
+                         NEON_BLUE, count, (2, 5), 0.0)
+    screen = pygame.Surface((WIDTH, HEIGHT))
+    return len(particles), lambda: particles.draw(screen)
+
+def random_positions(count):
+    return np.random.default_rng(count).integers(60, 600, (count, 2))
+
+def bugs_update(count):
+    bugs = BugStore()
+    bugs.extend(random_positions(count))
+    rng = RandomStreams(0)
+    return len(bugs), lambda: bugs.update(rng)
+
+def data_bytes_update(count):
+    data_bytes = DataByteStore()
+    data_bytes.extend(random_positions(count))
+    return len(data_bytes), data_bytes.update
+
+def start_level(count):
+    # A default-density level grown until it holds about `count` entities
+    sectors = max(1, math.ceil(count / ENTITIES_PER_SECTOR))
+    side = math.sqrt(sectors)
+    apply_overrides({
+        'WORLD_WIDTH': WIDTH * max(1, round(side)),
+        'WORLD_HEIGHT': HEIGHT * max(1, math.ceil(sectors / max(1, round(side))))
+    })
+    runner = HeadlessRunner()
+    runner.start(0)
+    state = runner.state
+    return runner, state, len(state.bugs) + len(state.data_bytes)
+
+def gameplay_update(count):
+    runner, state, entities = start_level(count)
+    return entities, state.update
+
+def gameplay_draw(count):
+    runner, state, entities = start_level(count)
+    return entities, state.draw
+
+def gameplay_draw_half_scale(count):
+    # Best quality tier, with the scene drawn at half resolution and scaled up
+    runner, state, entities = start_level(count)
+    runner.manager.set_quality(dict(QUALITY_TIERS[0], render_scale=0.5))
+    return entities, state.draw
+
+def full_frame(count):
+    # One main-loop iteration without the display flip
+    runner, state, entities = start_level(count)
+    manager = runner.manager
+    screen = manager.screen
+    def frame():
+        manager.update()
+        screen.fill(DARK_BLUE)
+        manager.draw()
+    return entities, frame
+
+CASES = {
+    'particles.update': particles_update,
+    'particles.draw': particles_draw,
+    'bugs.update': bugs_update,
+    'data_bytes.update': data_bytes_update,
+    'gameplay.update': gameplay_update,
+    'gameplay.draw': gameplay_draw,
+    'gameplay.draw_half_scale': gameplay_draw_half_scale,
+    'frame': full_frame
+}
+
+def state_draw_cases():
+    # Draw cost of every non-gameplay screen; independent of entity counts
+    runner = HeadlessRunner()
+    manager = runner.manager
+    for state_id, name in ((SPLASH, 'splash'), (MENU, 'menu'), (LOADING, 'loading'),
+                           (LEVEL_COMPLETE, 'level_complete'), (GAME_OVER, 'game_over')):
+        manager.change_state(state_id)
+        state = manager.states[state_id]
+        # A few updates so animated screens have particles on them
+        for _ in range(60):
+            state.update()
+        yield f"{name}.draw", state.draw
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine()
+    }
+
+def compare(results, baseline_path, threshold):
+    # Prints the change against a previous run; returns the regressed cases
+    with open(baseline_path) as f:
+        baseline = {(r['name'], r['count']): r for r in json.load(f)['results']}
+    regressions = []
+    print(f"\n{'case':<24} {'count':>8} {'before':>10} {'after':>10} {'change':>8}")
+    for result in results:
+        before = baseline.get((result['name'], result['count']))
+        if before is None:
+            continue
+        ratio = result['median_ms'] / before['median_ms']
+        flag = ' REGRESSION' if ratio > threshold else ''
+        print(f"{result['name']:<24} {str(result['count']):>8} {before['median_ms']:>10.3f} "
+              f"{result['median_ms']:>10.3f} {ratio:>7.2f}x{flag}")
+        if flag:
+            regressions.append(result)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game loop, states and object hot paths")
+    parser.add_argument('--counts', type=int, nargs='+', default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='+', help="Run only cases whose name starts with one of these")
+    parser.add_argument('--out', help="Write results as JSON to this file")
+    parser.add_argument('--compare', metavar='BASELINE', help="JSON results of an earlier run")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="Slowdown ratio against the baseline that counts as a regression")
+    args = parser.parse_args()
+
+    pygame.display.init()
+    pygame.font.init()
+    defaults = {name: getattr(settings, name) for name in ('WORLD_WIDTH', 'WORLD_HEIGHT')}
+    selected = lambda name: not args.only or name.startswith(tuple(args.only))
+
+    results = []
+    def record(name, count, entities, samples):
+        results.append({
+            'name': name,
+            'count': count,
+            'entities': entities,
+            'median_ms': statistics.median(samples),
+            'min_ms': min(samples),
+            'max_ms': max(samples),
+            'samples_ms': samples
+        })
+        print(f"{name:<24} {str(count):>8} {str(entities):>8} {statistics.median(samples):>10.4f} ms")
+
+    print(f"{'case':<24} {'count':>8} {'entities':>8} {'median':>13}")
+    for name, case in CASES.items():
+        if not selected(name):
+            continue
+        for count in args.counts:
+            entities, fn = case(count)
+            record(name, count, entities, measure(fn, args.repeat))
+            apply_overrides(defaults)
+    for name, fn in state_draw_cases():
+        if selected(name):
+            record(name, None, None, measure(fn, args.repeat))
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=2)
+        print(f"Results written to {args.out}")
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
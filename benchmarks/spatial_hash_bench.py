@@ -0,0 +1,79 @@
+# Microbenchmark: spatial hash vs. the brute-force distance loops that
+# GameplayState used for collisions and Q-Scan range checks.
+#
+#   python benchmarks/spatial_hash_bench.py [--counts 15 1000 10000]
+
+import argparse
+import math
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from settings import WIDTH, HEIGHT, Q_SCAN_RANGE, SPATIAL_CELL_SIZE
+from spatial_hash import SpatialHash
+
+class Entity:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+def make_world(count, seed):
+    # Keep entity density constant by growing the world with the count
+    rng = random.Random(seed)
+    scale = max(1.0, math.sqrt(count / 20))
+    world_w, world_h = WIDTH * scale, HEIGHT * scale
+    entities = [Entity(rng.uniform(0, world_w), rng.uniform(0, world_h)) for _ in range(count)]
+    probes = [(rng.uniform(0, world_w), rng.uniform(0, world_h)) for _ in range(100)]
+    return entities, probes
+
+def brute_force(entities, probes, radius):
+    hits = 0
+    for px, py in probes:
+        for e in entities:
+            if math.sqrt((px - e.x)**2 + (py - e.y)**2) < radius:
+                hits += 1
+    return hits
+
+def grid_query(grid, probes, radius):
+    hits = 0
+    for px, py in probes:
+        hits += len(grid.query_circle(px, py, radius))
+    return hits
+
+def main():
+    parser = argparse.ArgumentParser(description="Spatial hash vs. brute-force range checks")
+    parser.add_argument('--counts', type=int, nargs='+', default=[15, 100, 1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'entities':>9} {'radius':>7} {'brute ms':>10} {'grid ms':>10} {'speedup':>8}")
+    for count in args.counts:
+        entities, probes = make_world(count, seed=count)
+        grid = SpatialHash(SPATIAL_CELL_SIZE)
+        for e in entities:
+            grid.insert(e, e.x, e.y)
+
+        for radius in (45, Q_SCAN_RANGE):
+            assert brute_force(entities, probes, radius) == grid_query(grid, probes, radius)
+            brute = min(timeit.repeat(lambda: brute_force(entities, probes, radius),
+                                      number=1, repeat=args.repeat))
+            fast = min(timeit.repeat(lambda: grid_query(grid, probes, radius),
+                                     number=1, repeat=args.repeat))
+            # Per-probe cost, i.e. one frame's collision or scan check
+            print(f"{count:>9} {radius:>7} {brute * 10:>10.3f} {fast * 10:>10.3f} {brute / fast:>7.1f}x")
+
+        # Incremental updates: jitter every entity the way BugStore.update does
+        rng = random.Random(count)
+        def jitter():
+            for e in entities:
+                e.x += rng.randint(-2, 2)
+                e.y += rng.randint(-2, 2)
+                grid.move(e, e.x, e.y)
+        move = min(timeit.repeat(jitter, number=1, repeat=args.repeat))
+        print(f"{count:>9} {'move':>7} {'':>10} {move * 1000:>10.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+# Viewport onto a world that may be larger than the screen. The camera is
+# centred on a target and clamped to the world bounds; draw code subtracts
+# `offset` from world coordinates to get screen coordinates.
+class Camera:
+    def __init__(self, width, height, world_width, world_height):
+        self.width = width
+        self.height = height
+        self.resize(world_width, world_height)
+
+    def resize(self, world_width, world_height):
+        self.world_width = world_width
+        self.world_height = world_height
+        self.x = 0
+        self.y = 0
+        # Levels no bigger than the screen never scroll, so nothing is culled
+        self.covers_world = world_width <= self.width and world_height <= self.height
+
+    @property
+    def offset(self):
+        return (self.x, self.y)
+
+    def follow(self, x, y):
+        self.x = int(max(0, min(self.world_width - self.width, x - self.width / 2)))
+        self.y = int(max(0, min(self.world_height - self.height, y - self.height / 2)))
+
+    def view_rect(self, margin=0):
+        # World-space (left, top, width, height) of the viewport grown by margin
+        return (self.x - margin, self.y - margin,
+                self.width + margin * 2, self.height + margin * 2)
+
+    def to_screen(self, x, y):
+        return (x - self.x, y - self.y)
+
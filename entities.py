@@ -0,0 +1,212 @@
+import numpy as np
+from settings import *
+from game_objects import Bug, DataByte
+
+# Structure-of-arrays storage for the level's data bytes and bugs. Each
+# entity is a row in a set of parallel NumPy arrays plus a view object
+# (DataByte/Bug) that remembers its row. Removal swaps the last row into
+# the hole and re-points that row's view, so views stay valid and the live
+# rows are always [0, count). Views of removed entities are kept and handed
+# out again by extend(), so rebuilding the store for a new level reuses
+# both its arrays and its views.
+class EntityStore:
+    view_class = None
+    fields = ()
+    # Offset from an entity's (x, y) to its centre
+    center_offset = (0, 0)
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.views = []
+        self.spare = []
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        for name, dtype in self.fields:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        old = [getattr(self, name) for name, _ in self.fields]
+        self._allocate(capacity)
+        for (name, _), src in zip(self.fields, old):
+            getattr(self, name)[:self.count] = src[:self.count]
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.views)
+
+    def clear(self):
+        for view in self.views:
+            view.index = None
+        self.spare.extend(self.views)
+        self.views = []
+        self.count = 0
+
+    def extend(self, positions):
+        # Add one entity per (x, y) row; returns the new views
+        positions = np.asarray(positions)
+        n = len(positions)
+        start = self.count
+        if start + n > self.capacity:
+            self._grow(start + n)
+        for name, _ in self.fields:
+            getattr(self, name)[start:start + n] = 0
+        self.x[start:start + n] = positions[:, 0]
+        self.y[start:start + n] = positions[:, 1]
+        self.count += n
+        spare = self.spare
+        reused = min(n, len(spare))
+        views = spare[len(spare) - reused:]
+        del spare[len(spare) - reused:]
+        for i, view in enumerate(views, start):
+            view.index = i
+        views.extend(self.view_class(self, i) for i in range(start + reused, start + n))
+        self.views.extend(views)
+        self.initialize(slice(start, start + n))
+        return views
+
+    def initialize(self, rows):
+        pass
+
+    def remove(self, view):
+        i = view.index
+        last = self.count - 1
+        if i != last:
+            for name, _ in self.fields:
+                array = getattr(self, name)
+                array[i] = array[last]
+            moved = self.views[last]
+            moved.index = i
+            self.views[i] = moved
+        self.views.pop()
+        self.count = last
+        view.index = None
+        self.spare.append(view)
+
+    def remove_rows(self, rows):
+        # Bulk removal: holes below the new end are filled from the rows
+        # past it that survive, with one copy per field
+        rows = np.unique(rows)
+        end = self.count - len(rows)
+        holes = rows[rows < end]
+        tail = np.arange(end, self.count)
+        sources = tail[~np.isin(tail, rows)]
+        for name, _ in self.fields:
+            array = getattr(self, name)
+            array[holes] = array[sources]
+
+        views = self.views
+        for row in rows.tolist():
+            views[row].index = None
+            self.spare.append(views[row])
+        for hole, source in zip(holes.tolist(), sources.tolist()):
+            moved = views[source]
+            moved.index = hole
+            views[hole] = moved
+        del views[end:]
+        self.count = end
+
+    def rows_in_rect(self, left, top, width, height):
+        # Rows of the entities whose (x, y) lies inside the rect
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        return np.flatnonzero((x >= left) & (x < left + width) & (y >= top) & (y < top + height))
+
+    def snapshot_copy(self):
+        # An empty store to mirror this one into with copy_from()
+        return type(self)(self.capacity)
+
+    def copy_from(self, other):
+        # Row-for-row copy of another store; views are kept and reused
+        n = other.count
+        if n > self.capacity:
+            self._grow(n)
+        for name, _ in self.fields:
+            np.copyto(getattr(self, name)[:n], getattr(other, name)[:n])
+        views = self.views
+        if len(views) < n:
+            views.extend(self.view_class(self, i) for i in range(len(views), n))
+        else:
+            del views[n:]
+        self.count = n
+
+    def rows(self, views):
+        # Array of row indices for a sequence of views
+        return np.fromiter((view.index for view in views), dtype=np.intp, count=len(views))
+
+class DataByteStore(EntityStore):
+    view_class = DataByte
+    fields = (('x', np.float64), ('y', np.float64), ('pulse', np.float64), ('pulse_dir', np.int8))
+
+    def initialize(self, rows):
+        self.pulse_dir[rows] = 1
+
+    def update(self, rows=None):
+        # Pulse animation for the given rows (all when None)
+        if rows is None:
+            rows = slice(0, self.count)
+        pulse_dir = self.pulse_dir[rows]
+        pulse = self.pulse[rows] + 0.1 * pulse_dir
+        self.pulse[rows] = pulse
+        self.pulse_dir[rows] = np.where((pulse > 1) | (pulse < 0), -pulse_dir, pulse_dir)
+
+    def blits(self, atlas, rows=None, offset=(0, 0)):
+        # (sprite, position) pairs for the given rows (all when None)
+        if rows is None:
+            rows = slice(0, self.count)
+        frames = atlas.data_bytes
+        left = (self.x[rows] - offset[0]) * atlas.scale + atlas.data_byte_anchor[0]
+        top = (self.y[rows] - offset[1]) * atlas.scale + atlas.data_byte_anchor[1]
+        return [(frames[frame], (x, y)) for frame, x, y in
+                zip(atlas.pulse_frames(self.pulse[rows]).tolist(), left.tolist(), top.tolist())]
+
+class BugStore(EntityStore):
+    view_class = Bug
+    fields = (('x', np.float64), ('y', np.float64), ('glitch', np.int8),
+              ('health', np.int16), ('highlighted', np.bool_))
+    center_offset = (BUG_WIDTH / 2, BUG_HEIGHT / 2)
+
+    def initialize(self, rows):
+        self.health[rows] = 100
+        self.clamp(rows)
+
+    def clamp(self, rows):
+        # Keep bugs within world bounds
+        self.x[rows] = np.clip(self.x[rows], 50, WORLD_WIDTH - 50 - BUG_WIDTH)
+        self.y[rows] = np.clip(self.y[rows], 50, WORLD_HEIGHT - 50 - BUG_HEIGHT)
+
+    def update(self, rng, rows=None):
+        # Glitch jitter and random movement for the given rows (all when
+        # None); returns the rows of the bugs that moved
+        if rows is None:
+            rows = np.arange(self.count)
+        n = len(rows)
+        glitch = rng.cosmetic_batch.integers(-3, 4, n)
+        glitch[rng.cosmetic_batch.random(n) >= 0.2] = 0
+        self.glitch[rows] = glitch
+
+        moved = rows[rng.gameplay_batch.random(n) < 0.05]
+        if len(moved):
+            steps = rng.gameplay_batch.integers(-2, 3, (2, len(moved)))
+            self.x[moved] += steps[0]
+            self.y[moved] += steps[1]
+            self.clamp(moved)
+        return moved
+
+    def blits(self, atlas, rows=None, offset=(0, 0)):
+        # (sprite, position) pairs for the given rows (all when None)
+        if rows is None:
+            rows = slice(0, self.count)
+        variants = atlas.bugs
+        left = (self.x[rows] - offset[0]) * atlas.scale + atlas.bug_anchor[0]
+        top = (self.y[rows] - offset[1]) * atlas.scale + atlas.bug_anchor[1]
+        return [(variants[variant], (x, y)) for variant, x, y in
+                zip(atlas.bug_variants(self.highlighted[rows], self.glitch[rows]).tolist(),
+                    left.tolist(), top.tolist())]
@@ -1,42 +1,217 @@
 import pygame
-import random
 import math
+import time
+import numpy as np
 from settings import *
-from game_objects import Player, DataByte, Bug, Particle
+from input_provider import KeyboardInput
+from particles import ParticleBudget, ParticleSystem
+from profiler import FrameProfiler
+from rng import RandomStreams
+from tasks import BackgroundTasks
+from sprite_cache import blit_batch
+
+# Modules only the loading and gameplay screens need are imported when those
+# states are first built, which keeps them off the path to the first frame
+
+# One particle every 10 degrees for the Q-Scan ring
+SCAN_BURST_ANGLES = [math.radians(angle) for angle in range(0, 360, 10)]
+
+# Share of the loading bar taken by level generation
+LEVEL_LOAD_WEIGHT = 4
+
+# Off-screen band still drawn, covering bug glitch offsets and "!" markers
+DRAW_MARGIN = 64
+
+def level_params(level=1):
+    # Everything that determines a generated level apart from its seed, for
+    # the given campaign level
+    params = dict(LEVEL_PROFILES[LEVEL_PROFILE], world_width=WORLD_WIDTH, world_height=WORLD_HEIGHT)
+    params['bugs_per_sector'] += (level - 1) * CAMPAIGN_EXTRA_BUGS
+    return params
+
+def dirty_tiles(rects, tile=DIRTY_TILE_SIZE):
+    # Snap rects to a grid of tiles and return the touched tiles as disjoint
+    # row runs, so no pixel is repainted (and alpha-blended) twice
+    rows = (HEIGHT + tile - 1) // tile
+    cols = (WIDTH + tile - 1) // tile
+    marked = np.zeros((rows, cols), dtype=bool)
+    for rect in rects:
+        left = max(0, rect.left) // tile
+        top = max(0, rect.top) // tile
+        right = min(WIDTH, rect.right) - 1
+        bottom = min(HEIGHT, rect.bottom) - 1
+        if right >= 0 and bottom >= 0 and left < cols and top < rows:
+            marked[top:bottom // tile + 1, left:right // tile + 1] = True
+    
+    tiles = []
+    for row in np.flatnonzero(marked.any(axis=1)).tolist():
+        # Start and end columns of each run of marked tiles in this row
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], marked[row].view(np.int8), [0])))).tolist()
+        for start, end in zip(edges[::2], edges[1::2]):
+            tiles.append(pygame.Rect(start * tile, row * tile, (end - start) * tile, tile))
+    return tiles
+
+# States are constructed the first time they are looked up, so startup only
+# pays for the screens that are actually shown
+class StateTable(dict):
+    def __init__(self, manager, classes):
+        super().__init__()
+        self.manager = manager
+        self.classes = classes
+    
+    def __missing__(self, state_id):
+        state = self.classes[state_id](self.manager)
+        self[state_id] = state
+        return state
 
 class GameStateManager:
-    def __init__(self, screen, assets):
+    def __init__(self, screen, assets, input_provider=None, seed=None):
         self.screen = screen
         self.assets = assets
+        self.input = input_provider if input_provider is not None else KeyboardInput()
+        self.rng = RandomStreams(seed)
+        self.level_store = None
+        self.recorder = None
+        self.telemetry = None
+        self.scores = None
+        self.tasks = BackgroundTasks()
+        self.profiler = FrameProfiler()
+        self.particle_budget = ParticleBudget(PARTICLE_BUDGET)
+        self.quality = QUALITY_TIERS[0]
+        self.full_redraw = True
         self.current_state = SPLASH
-        self.states = {
-            SPLASH: SplashState(self),
-            MENU: MenuState(self),
-            LOADING: LoadingState(self),
-            GAMEPLAY: GameplayState(self),
-            LEVEL_COMPLETE: LevelCompleteState(self),
-            GAME_OVER: GameOverState(self)
-        }
+        self.frame = 0
+        # Campaign level being played, and the scores of its finished levels
+        self.level = 1
+        self.campaign_score = 0
+        self.states = StateTable(self, {
+            SPLASH: SplashState,
+            MENU: MenuState,
+            LOADING: LoadingState,
+            GAMEPLAY: GameplayState,
+            LEVEL_COMPLETE: LevelCompleteState,
+            GAME_OVER: GameOverState
+        })
         self.game_data = {
             'score': 0,
             'time': 0,
             'bugs_fixed': 0
         }
     
+    @property
+    def levels(self):
+        if self.level_store is None:
+            from level_gen import LevelStore
+            self.level_store = LevelStore()
+        return self.level_store
+    
+    def new_campaign(self):
+        self.level = 1
+        self.campaign_score = 0
+    
+    def particle_system(self, state_id):
+        particles = ParticleSystem(self.assets['sprites'], rng=self.rng.particles,
+                                   budget=PARTICLE_STATE_BUDGETS[state_id], shared=self.particle_budget)
+        particles.spawn_rate = self.quality['particle_rate']
+        particles.alpha = self.quality['particle_alpha']
+        return particles
+    
+    def set_quality(self, tier):
+        # Applies a QUALITY_TIERS entry to every screen
+        self.quality = tier
+        for particles in self.particle_budget.systems:
+            particles.spawn_rate = tier['particle_rate']
+            particles.alpha = tier['particle_alpha']
+    
     def change_state(self, new_state):
+        # A screen that is no longer shown gives its particles' budget back
+        old_state = self.states.get(self.current_state)
+        if old_state is not None and new_state != self.current_state:
+            old_state.particles.clear()
+        if self.telemetry is not None:
+            self.telemetry.state_change(self.frame, self.current_state, new_state)
+        # Built before it becomes current, so the render thread (which never
+        # builds states) always finds it in the table
+        state = self.states[new_state]
         self.current_state = new_state
-        self.states[new_state].enter()
+        self.full_redraw = True
+        state.enter()
     
     def handle_event(self, event):
+        # Profiler hotkeys are handled here and never reach the states
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.profiler.toggle()
+            return
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+            if self.profiler.enabled:
+                path = self.profiler.dump(f"profile-{time.strftime('%Y%m%d-%H%M%S')}")
+                print(f"Profile written to {path}.csv/.json")
+            return
         self.states[self.current_state].handle_event(event)
     
     def update(self):
+        self.frame += 1
         self.states[self.current_state].update()
     
-    def draw(self):
-        self.states[self.current_state].draw()
+    def draw(self, alpha=1.0):
+        # `alpha` is how far the frame is from the previous tick to the
+        # latest one (see GameState.interpolate)
+        state = self.states[self.current_state]
+        state.interpolate(alpha)
+        state.draw()
+        self.full_redraw = True
+    
+    def draw_dirty(self, alpha=1.0):
+        # Dirty-rectangle rendering; returns the changed rects, or None when
+        # the whole screen was redrawn and needs a full flip
+        state = self.states[self.current_state]
+        if not isinstance(state, LayeredState):
+            self.screen.fill(DARK_BLUE)
+            state.interpolate(alpha)
+            state.draw()
+            return None
+        # Dirty rects are found from the particles' tick positions, so
+        # layered screens are drawn at the latest tick
+        state.interpolate(1.0)
+        full = self.full_redraw
+        self.full_redraw = False
+        return state.draw_dirty(full)
+    
+    def draw_overlay(self):
+        self.profiler.draw_overlay(self.screen, self.assets['text'], self.frame)
+    
+    def record_session(self, state_id):
+        # Queues the session that just ended in `state_id` for the score store
+        if self.scores is not None:
+            self.scores.add(self.states[GAMEPLAY].session_seed, LEVEL_PROFILE, self.level, state_id,
+                            self.game_data)
+    
+    def load_best_score(self, done):
+        # Looks up the best stored score of a completed session of the
+        # current level off the main loop; done(score or None)
+        if self.scores is not None:
+            self.tasks.run(self.scores.best, LEVEL_PROFILE, self.level, LEVEL_COMPLETE, done=done)
+    
+    # The counts are also read from the render thread in pipelined mode, so
+    # they look states up without building them
+    def particle_count(self):
+        particles = getattr(self.states.get(self.current_state), 'particles', None)
+        return len(particles) if particles is not None else 0
+    
+    def entity_count(self):
+        state = self.states.get(GAMEPLAY)
+        if self.current_state != GAMEPLAY or state is None:
+            return 0
+        return len(state.data_bytes) + len(state.bugs)
 
 class GameState:
+    # Pipelined rendering (see pipeline.py) draws a render-side copy of the
+    # state. Attributes named in snapshot_copies are mirrored into the
+    # copy's own objects every tick, render_owned ones (with their initial
+    # values) belong to the copy alone, and the rest are shared.
+    snapshot_copies = ()
+    render_owned = {}
+    
     def __init__(self, manager):
         self.manager = manager
         self.screen = manager.screen
@@ -51,27 +226,111 @@ class GameState:
     def update(self):
         pass
     
+    def interpolate(self, alpha):
+        # Before drawing: draw `alpha` of the way from the previous tick to
+        # the latest one. The next update() starts from the latest tick again.
+        particles = getattr(self, 'particles', None)
+        if particles is not None:
+            particles.advance = alpha - 1
+    
     def draw(self):
         pass
 
-class SplashState(GameState):
+# Screens whose static panels and text are composited once into a cached
+# foreground layer. Besides the regular full-frame draw() they support
+# dirty-rectangle rendering: draw_dirty() repaints only the regions that
+# changed since the last frame and returns them for display.update().
+class LayeredState(GameState):
+    snapshot_copies = ('particles',)
+    render_owned = {'foreground': None, 'foreground_rect': None, 'foreground_built': -1,
+                    'above': [], 'dirty': []}
+    
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.foreground = None
+        self.foreground_rect = None
+        # The foreground is rebuilt whenever its version moves on
+        self.foreground_version = 0
+        self.foreground_built = -1
+        self.above = []
+        self.dirty = []
+    
+    def build_foreground(self, layer):
+        # Draw the state's static content onto the transparent layer
+        pass
+    
+    def draw_below(self):
+        # Dynamic content drawn underneath the foreground layer
+        self.particles.draw(self.screen)
+    
+    def draw_above(self):
+        # Dynamic content drawn over the foreground; returns the touched rects
+        return []
+    
+    def needs_full_redraw(self):
+        return False
+    
+    def invalidate_foreground(self):
+        self.foreground_version += 1
+    
+    def _ensure_foreground(self):
+        if self.foreground_built != self.foreground_version:
+            layer = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+            self.build_foreground(layer)
+            self.foreground = layer
+            self.foreground_rect = layer.get_bounding_rect()
+            self.foreground_built = self.foreground_version
+    
+    def draw(self):
+        self._ensure_foreground()
+        self.draw_below()
+        self.screen.blit(self.foreground, self.foreground_rect, self.foreground_rect)
+        self.above = self.draw_above()
+    
+    def draw_dirty(self, full):
+        # Returns the changed rects, or None when the whole screen was redrawn.
+        # A changed foreground may differ anywhere, so it is redrawn in full.
+        if full or self.needs_full_redraw() or self.foreground_built != self.foreground_version:
+            self.screen.fill(DARK_BLUE)
+            self.draw()
+            self.dirty = self.particles.rects() + self.above
+            return None
+        
+        self._ensure_foreground()
+        # Repaint last frame's dynamic regions and this frame's particle
+        # regions bottom-up, so every pixel is composited exactly once
+        current = self.particles.rects()
+        restore = dirty_tiles(self.dirty + current)
+        for rect in restore:
+            self.screen.fill(DARK_BLUE, rect)
+        self.draw_below()
+        self.screen.blits([(self.foreground, rect, rect) for rect in restore], False)
+        self.above = self.draw_above()
+        self.dirty = current + self.above
+        return restore + self.above
+
+class SplashState(LayeredState):
     def __init__(self, manager):
         super().__init__(manager)
         self.title_glitch = 0
         self.pulse_value = 0
         self.pulse_direction = 1
-        self.particles = []
+        self.particles = manager.particle_system(SPLASH)
+        # The prompt fades in and out; set_alpha() needs a surface of our own
+        # rather than the text cache's shared one
+        self.prompt = self.assets['text'].render('small', "PRESS ANY KEY TO BEGIN", True, WHITE).copy()
     
     def enter(self):
-        self.particles = []
+        self.particles.clear()
     
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
             self.manager.change_state(MENU)
     
     def update(self):
+        rng = self.manager.rng.cosmetic
         # Update title glitch effect
-        self.title_glitch = random.randint(-2, 2) if random.random() < 0.1 else 0
+        self.title_glitch = rng.randint(-2, 2) if rng.random() < 0.1 else 0
         
         # Update pulse effect
         self.pulse_value += 0.02 * self.pulse_direction
@@ -79,42 +338,40 @@ class SplashState(GameState):
             self.pulse_direction *= -1
         
         # Create background particles
-        if random.random() < 0.2:
-            self.particles.append(Particle(
-                random.randint(0, WIDTH),
-                random.randint(0, HEIGHT),
-                NEON_BLUE if random.random() < 0.7 else NEON_PURPLE,
-                random.randint(1, 3),
-                random.uniform(0.5, 1.5),
-                random.uniform(0, math.pi * 2)
-            ))
+        if rng.random() < 0.2:
+            self.particles.emit(
+                rng.randint(0, WIDTH),
+                rng.randint(0, HEIGHT),
+                NEON_BLUE if rng.random() < 0.7 else NEON_PURPLE,
+                rng.randint(1, 3),
+                rng.uniform(0.5, 1.5),
+                rng.uniform(0, math.pi * 2)
+            )
         
         # Update particles
-        for particle in self.particles[:]:
-            if particle.update():
-                self.particles.remove(particle)
+        self.particles.update()
     
-    def draw(self):
-        # Draw particles
-        for particle in self.particles:
-            particle.draw(self.screen)
-        
+    def build_foreground(self, layer):
+        title_text = self.assets['text'].render('large', "CodeFlow", True, NEON_BLUE)
+        subtitle_text = self.assets['text'].render('medium', "The Debugging Odyssey", True, NEON_PURPLE)
+        layer.blit(subtitle_text, (WIDTH/2 - subtitle_text.get_width()/2, HEIGHT/3 + title_text.get_height() + 10))
+    
+    def draw_above(self):
         # Draw title
-        title_text = self.assets['fonts']['large'].render("CodeFlow", True, NEON_BLUE)
-        subtitle_text = self.assets['fonts']['medium'].render("The Debugging Odyssey", True, NEON_PURPLE)
-        self.screen.blit(title_text, (WIDTH/2 - title_text.get_width()/2 + self.title_glitch, HEIGHT/3 + self.title_glitch))
-        self.screen.blit(subtitle_text, (WIDTH/2 - subtitle_text.get_width()/2, HEIGHT/3 + title_text.get_height() + 10))
+        title_text = self.assets['text'].render('large', "CodeFlow", True, NEON_BLUE)
+        rects = [self.screen.blit(title_text, (WIDTH/2 - title_text.get_width()/2 + self.title_glitch, HEIGHT/3 + self.title_glitch))]
         
         # Draw prompt
-        prompt_text = self.assets['fonts']['small'].render("PRESS ANY KEY TO BEGIN", True, WHITE)
+        prompt_text = self.prompt
         prompt_alpha = int(255 * (0.5 + self.pulse_value/2))
         prompt_text.set_alpha(prompt_alpha)
-        self.screen.blit(prompt_text, (WIDTH/2 - prompt_text.get_width()/2, HEIGHT * 2/3))
+        rects.append(self.screen.blit(prompt_text, (WIDTH/2 - prompt_text.get_width()/2, HEIGHT * 2/3)))
+        return rects
 
-class MenuState(GameState):
+class MenuState(LayeredState):
     def __init__(self, manager):
         super().__init__(manager)
-        self.particles = []
+        self.particles = manager.particle_system(MENU)
         self.options = ["START DEBUGGING", "EXIT"]
         self.selected_option = 0
     
@@ -126,106 +383,141 @@ class MenuState(GameState):
                 self.selected_option = (self.selected_option + 1) % len(self.options)
             elif event.key == pygame.K_RETURN or event.key == pygame.K_SPACE:
                 if self.selected_option == 0:  # START DEBUGGING
+                    self.manager.new_campaign()
                     self.manager.change_state(LOADING)
                 elif self.selected_option == 1:  # EXIT
-                    pygame.quit()
-                    exit()
+                    # The main loop shuts down on QUIT, whichever thread this runs on
+                    pygame.event.post(pygame.event.Event(pygame.QUIT))
     
     def update(self):
+        rng = self.manager.rng.cosmetic
         # Create background particles
-        if random.random() < 0.1:
-            self.particles.append(Particle(
-                random.randint(0, WIDTH),
-                random.randint(0, HEIGHT),
-                NEON_BLUE if random.random() < 0.7 else NEON_PURPLE,
-                random.randint(1, 3),
-                random.uniform(0.5, 1.5),
-                random.uniform(0, math.pi * 2)
-            ))
+        if rng.random() < 0.1:
+            self.particles.emit(
+                rng.randint(0, WIDTH),
+                rng.randint(0, HEIGHT),
+                NEON_BLUE if rng.random() < 0.7 else NEON_PURPLE,
+                rng.randint(1, 3),
+                rng.uniform(0.5, 1.5),
+                rng.uniform(0, math.pi * 2)
+            )
         
         # Update particles
-        for particle in self.particles[:]:
-            if particle.update():
-                self.particles.remove(particle)
+        self.particles.update()
     
-    def draw(self):
-        # Draw particles
-        for particle in self.particles:
-            particle.draw(self.screen)
-        
-        # Draw menu options
+    def build_foreground(self, layer):
+        for i, option in enumerate(self.options):
+            option_text = self.assets['text'].render('medium', option, True, WHITE)
+            layer.blit(option_text, option_text.get_rect(center=(WIDTH/2, HEIGHT/3 + i * 80)))
+    
+    def draw_above(self):
+        # Draw menu option frames
+        rects = []
         for i, option in enumerate(self.options):
             y_pos = HEIGHT/3 + i * 80
-            option_text = self.assets['fonts']['medium'].render(option, True, WHITE)
+            option_text = self.assets['text'].render('medium', option, True, WHITE)
             option_rect = option_text.get_rect(center=(WIDTH/2, y_pos))
             
-            # Highlight effect
-            highlight = math.sin(pygame.time.get_ticks() * 0.003 + i) * 0.5 + 0.5
+            # Highlight effect (pygame's tick counter needs the full pygame.init())
+            highlight = math.sin(time.perf_counter() * 3 + i) * 0.5 + 0.5
             color = NEON_GREEN if i == self.selected_option else (
                 int(NEON_BLUE[0] * highlight),
                 int(NEON_BLUE[1] * highlight),
                 int(NEON_BLUE[2] * highlight)
             )
-            pygame.draw.rect(self.screen, color, (option_rect.x - 20, option_rect.y - 10, option_rect.width + 40, option_rect.height + 20), 2, border_radius=10)
-            
-            self.screen.blit(option_text, option_rect)
+            rects.append(pygame.draw.rect(self.screen, color, (option_rect.x - 20, option_rect.y - 10, option_rect.width + 40, option_rect.height + 20), 2, border_radius=10))
+        return rects
 
 class LoadingState(GameState):
+    snapshot_copies = ('particles',)
+    
     def __init__(self, manager):
         super().__init__(manager)
-        self.particles = []
-        self.start_time = 0
-        self.load_duration = 3000  # 3 seconds
+        self.particles = manager.particle_system(LOADING)
+        from loader import Loader
+        self.loader = Loader()
+        self.assets_queued = False
     
     def enter(self):
-        self.start_time = pygame.time.get_ticks()
+        self.loader.reset()
+        # Assets are loaded once; the next session's level every time
+        if not self.assets_queued:
+            from loader import queue_asset_jobs
+            queue_asset_jobs(self.loader, self.assets)
+            self.assets_queued = True
+        seed = self.manager.rng.reserve_session()
+        self.loader.add_future(LEVEL_LOAD_WEIGHT, self.manager.levels.prefetch(seed, level_params()))
     
     def update(self):
+        rng = self.manager.rng.cosmetic
         # Create background particles
-        if random.random() < 0.1:
-            self.particles.append(Particle(
-                random.randint(0, WIDTH),
-                random.randint(0, HEIGHT),
-                NEON_BLUE if random.random() < 0.7 else NEON_PURPLE,
-                random.randint(1, 3),
-                random.uniform(0.5, 1.5),
-                random.uniform(0, math.pi * 2)
-            ))
+        if rng.random() < 0.1:
+            self.particles.emit(
+                rng.randint(0, WIDTH),
+                rng.randint(0, HEIGHT),
+                NEON_BLUE if rng.random() < 0.7 else NEON_PURPLE,
+                rng.randint(1, 3),
+                rng.uniform(0.5, 1.5),
+                rng.uniform(0, math.pi * 2)
+            )
         
         # Update particles
-        for particle in self.particles[:]:
-            if particle.update():
-                self.particles.remove(particle)
+        self.particles.update()
         
         # Check if loading is complete
-        current_time = pygame.time.get_ticks()
-        if current_time - self.start_time >= self.load_duration:
+        if self.loader.poll():
             self.manager.change_state(GAMEPLAY)
     
     def draw(self):
         # Draw particles
-        for particle in self.particles:
-            particle.draw(self.screen)
+        self.particles.draw(self.screen)
         
         # Draw loading text
-        loading_text = self.assets['fonts']['medium'].render("LOADING PROGRAM...", True, WHITE)
+        loading_text = self.assets['text'].render('medium', "LOADING PROGRAM...", True, WHITE)
         self.screen.blit(loading_text, (WIDTH/2 - loading_text.get_width()/2, HEIGHT/3))
         
         # Draw loading bar
         bar_width = 400
-        current_time = pygame.time.get_ticks()
-        progress = min(1.0, (current_time - self.start_time) / self.load_duration)
+        progress = self.loader.progress
         pygame.draw.rect(self.screen, (50, 60, 80), (WIDTH/2 - bar_width/2, HEIGHT/2, bar_width, 20), border_radius=10)
         pygame.draw.rect(self.screen, NEON_BLUE, (WIDTH/2 - bar_width/2, HEIGHT/2, bar_width * progress, 20), border_radius=10)
 
 class GameplayState(GameState):
+    snapshot_copies = ('player', 'camera', 'data_bytes', 'bugs', 'particles')
+    render_owned = {'byte_grid': None, 'bug_grid': None, 'player_shift': (0, 0), 'scene': None}
+    
     def __init__(self, manager):
         super().__init__(manager)
-        self.player = Player(100, HEIGHT - 150)
-        self.data_bytes = []
-        self.bugs = []
-        self.particles = []
-        self.start_time = 0
+        from abilities import AbilityEngine
+        from atlas import EntityAtlas
+        from camera import Camera
+        from entities import BugStore, DataByteStore
+        from game_objects import Player
+        from hud import GameplayHud
+        from spatial_hash import SpatialHash
+        self.player = Player(*PLAYER_START)
+        self.data_bytes = DataByteStore()
+        self.bugs = BugStore()
+        self.particles = manager.particle_system(GAMEPLAY)
+        self.byte_grid = SpatialHash(SPATIAL_CELL_SIZE)
+        self.bug_grid = SpatialHash(SPATIAL_CELL_SIZE)
+        self.abilities = AbilityEngine(self.bugs, self.bug_grid, self.particles)
+        self.hud = GameplayHud(self.assets)
+        self.atlas = EntityAtlas(self.assets['text'])
+        # Atlases for reduced render scales, built when a tier first uses them
+        self.atlases = {1.0: self.atlas}
+        self.scene = None
+        self.camera = Camera(WIDTH, HEIGHT, WORLD_WIDTH, WORLD_HEIGHT)
+        # Player position before the latest tick, and the render-side shift
+        # of the player from there (pipelined rendering)
+        self.player_previous = PLAYER_START
+        self.player_shift = (0, 0)
+        self.session_seed = None
+        self.frame = 0
+        # Level being built into the stores ahead of enter(): its
+        # (seed, level) and the generator doing the work
+        self.staged = None
+        self.staging = None
     
     def enter(self):
         # Reset game data for new game
@@ -235,182 +527,244 @@ class GameplayState(GameState):
             'bugs_fixed': 0
         }
         
-        self.player = Player(100, HEIGHT - 150)
-        self.data_bytes = []
-        self.bugs = []
-        self.particles = []
-        self.start_time = pygame.time.get_ticks()
-        
-        # Generate data bytes and bugs
-        for _ in range(15):  # Increased number of data bytes
-            self.data_bytes.append(DataByte(
-                random.randint(100, WIDTH - 100),
-                random.randint(100, HEIGHT - 100)
-            ))
-        
-        # Create bugs in more accessible positions
-        bug_positions = [
-            (WIDTH // 4, HEIGHT // 3),
-            (WIDTH // 2, HEIGHT // 4),
-            (3 * WIDTH // 4, HEIGHT // 3),
-            (WIDTH // 4, 2 * HEIGHT // 3),
-            (3 * WIDTH // 4, 2 * HEIGHT // 3)
-        ]
+        self.session_seed = self.manager.rng.begin_session()
+        
+        # Finish building the level, unless it was already staged in the
+        # background; everything else is reset in place
+        if self.staged != (self.session_seed, self.manager.level):
+            self.stage(self.session_seed, self.manager.level)
+        self.finish_staging()
         
-        for pos in bug_positions:
-            self.bugs.append(Bug(
-                pos[0] + random.randint(-50, 50),
-                pos[1] + random.randint(-50, 50)
-            ))
+        self.player.reset(*PLAYER_START)
+        self.player_previous = PLAYER_START
+        self.particles.clear()
+        self.camera.resize(WORLD_WIDTH, WORLD_HEIGHT)
+        self.frame = 0
+        
+        self.camera.follow(self.player.x + self.player.width/2, self.player.y + self.player.height/2)
+        
+        if self.manager.recorder is not None:
+            self.manager.recorder.begin(self.session_seed, self.manager.level)
+    
+    def stage(self, seed, level):
+        # Start building a level into the stores while another screen is
+        # shown; stage_step() advances it and enter() finishes it
+        self.staged = (seed, level)
+        self.staging = self._build_level(seed, level)
+    
+    def stage_step(self, budget_ms=LEVEL_STAGE_BUDGET_MS):
+        # Returns True once the staged level is complete
+        if self.staging is None:
+            return True
+        deadline = time.perf_counter() + budget_ms / 1000
+        for waiting in self.staging:
+            if waiting is not None or time.perf_counter() >= deadline:
+                return False
+        self.staging = None
+        return True
+    
+    def finish_staging(self):
+        for waiting in self.staging or ():
+            if waiting is not None:
+                waiting.result()
+        self.staging = None
+        self.staged = None
+    
+    def _build_level(self, seed, level_number):
+        # Generator: fills the stores and registers the entities with the
+        # spatial indexes, yielding between chunks of LEVEL_STAGE_CHUNK
+        # entities, and yields the generation future while it is not done
+        params = level_params(level_number)
+        future = self.manager.levels.prefetch(seed, params)
+        while not future.done():
+            yield future
+        level = self.manager.levels.get(seed, params)
+        
+        self.data_bytes.clear()
+        self.bugs.clear()
+        self.byte_grid.clear()
+        self.bug_grid.clear()
+        for positions, store, grid in ((level.data_bytes, self.data_bytes, self.byte_grid),
+                                       (level.bugs, self.bugs, self.bug_grid)):
+            for start in range(0, len(positions), LEVEL_STAGE_CHUNK):
+                views = store.extend(positions[start:start + LEVEL_STAGE_CHUNK])
+                rows = slice(store.count - len(views), store.count)
+                for view, x, y in zip(views, store.x[rows].tolist(), store.y[rows].tolist()):
+                    grid.insert(view, x, y)
+                yield
+    
+    def near_rows(self, store, grid, margin):
+        # Store rows of the entities in the grid cells around the viewport;
+        # None (all of them) on levels the camera fully covers
+        if self.camera.covers_world:
+            return None
+        if grid is None:
+            # Render-side copies have no index; filter the store by position
+            return store.rows_in_rect(*self.camera.view_rect(margin))
+        return store.rows(grid.query_rect(*self.camera.view_rect(margin)))
     
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
+            if self.manager.recorder is not None:
+                self.manager.recorder.record_event(event.key)
+            
             # Q-Scan ability
             if event.key == pygame.K_q:
                 # Highlight bugs within range
-                for bug in self.bugs:
-                    distance = math.sqrt((self.player.x - bug.x)**2 + (self.player.y - bug.y)**2)
-                    if distance < 400:  # Increased scan range from 200 to 400
-                        bug.highlighted = True
-                        
+                highlighted = self.abilities.scan(self.player.x, self.player.y, Q_SCAN_RANGE)
+                if self.manager.telemetry is not None:
+                    self.manager.telemetry.scan(self.manager.frame, highlighted)
+                
                 # Create scan effect particles
-                for angle in range(0, 360, 10):
-                    self.particles.append(Particle(
-                        self.player.x + self.player.width/2,
-                        self.player.y + self.player.height/2,
-                        NEON_BLUE,
-                        random.randint(3, 6),
-                        random.uniform(2, 4),
-                        math.radians(angle)
-                    ))
+                self.particles.emit_burst(
+                    self.player.x + self.player.width/2,
+                    self.player.y + self.player.height/2,
+                    NEON_BLUE,
+                    len(SCAN_BURST_ANGLES),
+                    (3, 6),
+                    (2, 4),
+                    SCAN_BURST_ANGLES
+                )
             
             # Q-Fix ability
-            if event.key == pygame.K_e and self.player.q_energy >= 20:
-                self.player.q_energy -= 20
-                bugs_fixed = 0
+            if event.key == pygame.K_e and self.player.q_energy >= Q_FIX_ENERGY_COST:
+                self.player.q_energy -= Q_FIX_ENERGY_COST
                 
-                # Fix highlighted bugs
-                for bug in self.bugs[:]:
-                    if bug.highlighted and math.sqrt((self.player.x - bug.x)**2 + (self.player.y - bug.y)**2) < 400:  # Increased fix range from 200 to 400
-                        # Create fix effect
-                        for _ in range(20):
-                            self.particles.append(Particle(
-                                bug.x + bug.width/2,
-                                bug.y + bug.height/2,
-                                NEON_GREEN,
-                                random.randint(3, 8),
-                                random.uniform(1, 3),
-                                random.uniform(0, math.pi * 2)
-                            ))
-                        self.bugs.remove(bug)
-                        bugs_fixed += 1
-                        self.manager.game_data['bugs_fixed'] += 1
+                # Fix highlighted bugs in range, with a fix effect on each
+                bugs_fixed = self.abilities.fix(self.player.x, self.player.y, Q_SCAN_RANGE)
+                self.manager.game_data['bugs_fixed'] += bugs_fixed
                 
                 if bugs_fixed == 0:
                     # No bugs fixed - refund energy
-                    self.player.q_energy += 20
+                    self.player.q_energy += Q_FIX_ENERGY_COST
+                if self.manager.telemetry is not None:
+                    self.manager.telemetry.fix(self.manager.frame, bugs_fixed,
+                                               Q_FIX_ENERGY_COST if bugs_fixed else 0)
     
     def update(self):
+        self.frame += 1
+        if self.manager.recorder is not None:
+            self.manager.recorder.record_frame(self.manager.input.get_pressed())
+        
         # Update player
-        self.player.update()
+        self.player_previous = (self.player.x, self.player.y)
+        self.player.update(self.manager.input)
+        self.camera.follow(self.player.x + self.player.width/2, self.player.y + self.player.height/2)
         
-        # Update data bytes
-        for byte in self.data_bytes:
-            byte.update()
+        # Update data bytes (only those near the viewport; distant ones stay frozen)
+        self.data_bytes.update(self.near_rows(self.data_bytes, self.byte_grid, SIM_MARGIN))
         
-        # Update bugs
-        for bug in self.bugs:
-            bug.update()
+        # Update bugs, re-indexing the ones that moved
+        bugs = self.bugs
+        for row in bugs.update(self.manager.rng, self.near_rows(bugs, self.bug_grid, SIM_MARGIN)).tolist():
+            self.bug_grid.move(bugs.views[row], bugs.x[row], bugs.y[row])
         
         # Update particles
-        for particle in self.particles[:]:
-            if particle.update():
-                self.particles.remove(particle)
+        self.particles.update()
+        
+        player_cx = self.player.x + self.player.width/2
+        player_cy = self.player.y + self.player.height/2
         
         # Check player collision with data bytes - improved collision detection
-        for byte in self.data_bytes[:]:
-            distance = math.sqrt((self.player.x + self.player.width/2 - byte.x)**2 + 
-                                (self.player.y + self.player.height/2 - byte.y)**2)
-            if distance < self.player.width/2 + byte.size:
-                self.data_bytes.remove(byte)
-                self.player.q_energy = min(PLAYER_MAX_ENERGY, self.player.q_energy + 10)
-                
-                # Create collection effect
-                for _ in range(10):
-                    self.particles.append(Particle(
-                        byte.x,
-                        byte.y,
-                        NEON_BLUE,
-                        random.randint(2, 5),
-                        random.uniform(1, 2),
-                        random.uniform(0, math.pi * 2)
-                    ))
+        for byte in self.byte_grid.query_circle(player_cx, player_cy, self.player.width/2 + DATA_BYTE_SIZE):
+            self.player.q_energy = min(PLAYER_MAX_ENERGY, self.player.q_energy + DATA_BYTE_ENERGY)
+            
+            # Create collection effect
+            self.particles.emit_burst(
+                byte.x,
+                byte.y,
+                NEON_BLUE,
+                10,
+                (2, 5),
+                (1, 2)
+            )
+            self.data_bytes.remove(byte)
+            self.byte_grid.remove(byte)
         
         # Check player collision with bugs - improved collision detection
-        for bug in self.bugs:
-            distance = math.sqrt((self.player.x + self.player.width/2 - bug.x - bug.width/2)**2 + 
-                                (self.player.y + self.player.height/2 - bug.y - bug.height/2)**2)
-            if distance < (self.player.width + bug.width)/2 and not bug.highlighted:
+        # (bugs are indexed by their top-left corner, so shift the query centre)
+        for bug in self.bug_grid.query_circle(player_cx - BUG_WIDTH/2, player_cy - BUG_HEIGHT/2,
+                                              (self.player.width + BUG_WIDTH)/2):
+            if not bug.highlighted:
                 self.player.health -= 1
                 if self.player.health <= 0:
                     # Update game data
-                    self.manager.game_data['time'] = (pygame.time.get_ticks() - self.start_time) // 1000
+                    self.manager.game_data['time'] = self.frame // FPS
                     self.manager.game_data['score'] = (self.player.health + self.player.q_energy) * 10
                     self.manager.change_state(GAME_OVER)
+                    break
         
         # Check win condition
-        if len(self.bugs) == 0:
+        if self.manager.current_state == GAMEPLAY and len(self.bugs) == 0:
             # Update game data
-            self.manager.game_data['time'] = (pygame.time.get_ticks() - self.start_time) // 1000
+            self.manager.game_data['time'] = self.frame // FPS
             self.manager.game_data['score'] = (self.player.health + self.player.q_energy) * 10
             self.manager.change_state(LEVEL_COMPLETE)
+        
+        # Session over: seal the input log with the final results
+        if self.manager.current_state != GAMEPLAY and self.manager.recorder is not None:
+            self.manager.recorder.finish(self.manager.game_data)
+    
+    def interpolate(self, alpha):
+        super().interpolate(alpha)
+        px, py = self.player_previous
+        shift_x = (self.player.x - px) * (alpha - 1)
+        shift_y = (self.player.y - py) * (alpha - 1)
+        self.player_shift = (shift_x, shift_y)
+        self.camera.follow(self.player.x + shift_x + self.player.width/2,
+                           self.player.y + shift_y + self.player.height/2)
     
     def draw(self):
-        # Draw data bytes
-        for byte in self.data_bytes:
-            byte.draw(self.screen)
-        
-        # Draw bugs
-        for bug in self.bugs:
-            bug.draw(self.screen)
-        
-        # Draw player
-        self.player.draw(self.screen)
+        offset = self.camera.offset
+        player_offset = (offset[0] - self.player_shift[0], offset[1] - self.player_shift[1])
+        glow = self.manager.quality['glow']
+        scale = self.manager.quality['render_scale']
+        
+        # Reduced render scale: the scene goes to a smaller surface that is
+        # scaled up to the window afterwards
+        target = self.screen
+        if scale != 1:
+            if scale not in self.atlases:
+                from atlas import EntityAtlas
+                self.atlases[scale] = EntityAtlas(self.assets['text'], scale)
+            size = (round(WIDTH * scale), round(HEIGHT * scale))
+            if self.scene is None or self.scene.get_size() != size:
+                self.scene = pygame.Surface(size, 0, self.screen)
+            target = self.scene
+            target.fill(DARK_BLUE)
+        
+        # Draw data bytes, bugs and the player from the atlas in one batch
+        atlas = self.atlases[scale]
+        player = atlas.players[(self.player.direction, glow)]
+        blit_batch(target,
+                   self.data_bytes.blits(atlas, self.near_rows(self.data_bytes, self.byte_grid, DRAW_MARGIN), offset)
+                   + self.bugs.blits(atlas, self.near_rows(self.bugs, self.bug_grid, DRAW_MARGIN), offset)
+                   + [(player, ((self.player.x - player_offset[0]) * scale + atlas.player_anchor[0],
+                                (self.player.y - player_offset[1]) * scale + atlas.player_anchor[1]))])
         
         # Draw particles
-        for particle in self.particles:
-            particle.draw(self.screen)
-        
-        # Draw HUD
-        # Health bar
-        pygame.draw.rect(self.screen, (50, 50, 50), (20, 20, 200, 20), border_radius=5)
-        pygame.draw.rect(self.screen, (255, 50, 50), (20, 20, self.player.health * 2, 20), border_radius=5)
-        health_text = self.assets['fonts']['small'].render(f"Health: {self.player.health}", True, WHITE)
-        self.screen.blit(health_text, (25, 45))
-        
-        # Q-Energy bar
-        pygame.draw.rect(self.screen, (50, 50, 50), (WIDTH - 220, 20, 200, 20), border_radius=5)
-        pygame.draw.rect(self.screen, NEON_BLUE, (WIDTH - 220, 20, self.player.q_energy * 2, 20), border_radius=5)
-        energy_text = self.assets['fonts']['small'].render(f"Q-Energy: {self.player.q_energy}", True, WHITE)
-        self.screen.blit(energy_text, (WIDTH - 215, 45))
-        
-        # Bug counter
-        bug_text = self.assets['fonts']['small'].render(f"Bugs: {len(self.bugs)}", True, WHITE)
-        self.screen.blit(bug_text, (WIDTH/2 - bug_text.get_width()/2, 20))
-        
-        # Controls hint
-        controls_text = self.assets['fonts']['small'].render("Q: Scan bugs | E: Fix bugs | Arrow keys: Move in all directions", True, WHITE)
-        self.screen.blit(controls_text, (WIDTH/2 - controls_text.get_width()/2, HEIGHT - 40))
-        
-        # Draw scan range indicator (faint circle)
-        s = pygame.Surface((800, 800), pygame.SRCALPHA)
-        pygame.draw.circle(s, (0, 195, 255, 30), (400, 400), 400)
-        self.screen.blit(s, (self.player.x + self.player.width/2 - 400, self.player.y + self.player.height/2 - 400))
+        self.particles.draw(target, offset, scale)
+        if target is not self.screen:
+            pygame.transform.scale(target, self.screen.get_size(), self.screen)
+        
+        # Draw HUD and scan range indicator
+        self.hud.draw(self.screen, self.player, len(self.bugs), player_offset, glow)
 
-class LevelCompleteState(GameState):
+class LevelCompleteState(LayeredState):
     def __init__(self, manager):
         super().__init__(manager)
-        self.particles = []
+        self.particles = manager.particle_system(LEVEL_COMPLETE)
+        # Best stored score (None: no sessions yet) once the lookup has
+        # answered; lookups are numbered so a late answer for an earlier
+        # visit is ignored
+        self.best = None
+        self.best_loaded = False
+        self.lookup = 0
+        self.staging = False
+    
+    @property
+    def final_level(self):
+        return self.manager.level >= CAMPAIGN_LEVELS
     
     def enter(self):
         # Calculate final score based on health, energy, and bugs fixed
@@ -418,40 +772,61 @@ class LevelCompleteState(GameState):
             self.manager.game_data['bugs_fixed'] * 100 + 
             self.manager.game_data['time'] * 5
         )
+        self.manager.campaign_score += self.manager.game_data['score']
+        # The next level is built from the first update() on
+        self.staging = not self.final_level
+        self.best_loaded = False
+        self.lookup += 1
+        self.manager.load_best_score(lambda best, lookup=self.lookup: self.show_best(best, lookup))
+        self.manager.record_session(LEVEL_COMPLETE)
+        self.invalidate_foreground()
+    
+    def show_best(self, best, lookup):
+        if lookup == self.lookup:
+            self.best = best
+            self.best_loaded = True
+            self.invalidate_foreground()
     
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN or (event.type == pygame.MOUSEBUTTONDOWN and event.button == 1):
-            self.manager.change_state(MENU)
+            if self.final_level:
+                self.manager.change_state(MENU)
+            else:
+                self.manager.level += 1
+                self.manager.change_state(GAMEPLAY)
     
     def update(self):
+        # Build the next level into the gameplay state a slice per frame, so
+        # moving on to it only has to reset the player
+        if self.staging:
+            gameplay = self.manager.states[GAMEPLAY]
+            if gameplay.staged is None:
+                gameplay.stage(self.manager.rng.reserve_session(), self.manager.level + 1)
+            self.staging = not gameplay.stage_step()
+        
+        rng = self.manager.rng.cosmetic
         # Create celebratory particles
-        if random.random() < 0.3:
-            self.particles.append(Particle(
-                random.randint(0, WIDTH),
-                random.randint(0, HEIGHT),
-                NEON_GREEN if random.random() < 0.7 else NEON_BLUE,
-                random.randint(2, 5),
-                random.uniform(1, 3),
-                random.uniform(0, math.pi * 2)
-            ))
+        if rng.random() < 0.3:
+            self.particles.emit(
+                rng.randint(0, WIDTH),
+                rng.randint(0, HEIGHT),
+                NEON_GREEN if rng.random() < 0.7 else NEON_BLUE,
+                rng.randint(2, 5),
+                rng.uniform(1, 3),
+                rng.uniform(0, math.pi * 2)
+            )
         
         # Update particles
-        for particle in self.particles[:]:
-            if particle.update():
-                self.particles.remove(particle)
+        self.particles.update()
     
-    def draw(self):
-        # Draw particles
-        for particle in self.particles:
-            particle.draw(self.screen)
-        
+    def build_foreground(self, layer):
         # Draw completion panel
-        pygame.draw.rect(self.screen, (30, 40, 60), (WIDTH/2 - 250, HEIGHT/2 - 200, 500, 400), border_radius=15)
-        pygame.draw.rect(self.screen, NEON_GREEN, (WIDTH/2 - 250, HEIGHT/2 - 200, 500, 400), 2, border_radius=15)
+        pygame.draw.rect(layer, (30, 40, 60), (WIDTH/2 - 250, HEIGHT/2 - 200, 500, 400), border_radius=15)
+        pygame.draw.rect(layer, NEON_GREEN, (WIDTH/2 - 250, HEIGHT/2 - 200, 500, 400), 2, border_radius=15)
         
         # Draw completion text
-        complete_text = self.assets['fonts']['large'].render("PROGRAM DEBUGGED!", True, NEON_GREEN)
-        self.screen.blit(complete_text, (WIDTH/2 - complete_text.get_width()/2, HEIGHT/2 - 150))
+        complete_text = self.assets['text'].render('large', "PROGRAM DEBUGGED!", True, NEON_GREEN)
+        layer.blit(complete_text, (WIDTH/2 - complete_text.get_width()/2, HEIGHT/2 - 150))
         
         # Draw stats
         stats = [
@@ -461,62 +836,84 @@ class LevelCompleteState(GameState):
         ]
         
         for i, stat in enumerate(stats):
-            stat_text = self.assets['fonts']['medium'].render(stat, True, WHITE)
-            self.screen.blit(stat_text, (WIDTH/2 - stat_text.get_width()/2, HEIGHT/2 - 50 + i * 50))
+            stat_text = self.assets['text'].render('medium', stat, True, WHITE)
+            layer.blit(stat_text, (WIDTH/2 - stat_text.get_width()/2, HEIGHT/2 - 55 + i * 45))
+        
+        # Draw campaign progress
+        progress = f"Level {self.manager.level} of {CAMPAIGN_LEVELS} - Total Score: {self.manager.campaign_score}"
+        progress_text = self.assets['text'].render('small', progress, True, NEON_GREEN)
+        layer.blit(progress_text, (WIDTH/2 - progress_text.get_width()/2, HEIGHT/2 + 82))
+        
+        # Draw the high score once the score store has answered
+        if self.best_loaded:
+            score = self.manager.game_data['score']
+            if self.best is None or score > self.best:
+                best_text = self.assets['text'].render('small', "NEW HIGH SCORE!", True, NEON_BLUE)
+            else:
+                best_text = self.assets['text'].render('small', f"High Score: {self.best}", True, NEON_BLUE)
+            layer.blit(best_text, (WIDTH/2 - best_text.get_width()/2, HEIGHT/2 - 90))
         
         # Draw continue button
-        pygame.draw.rect(self.screen, NEON_GREEN, (WIDTH/2 - 100, HEIGHT/2 + 120, 200, 50), border_radius=10)
-        continue_text = self.assets['fonts']['small'].render("CONTINUE", True, (30, 40, 60))
-        self.screen.blit(continue_text, (WIDTH/2 - continue_text.get_width()/2, HEIGHT/2 + 135))
+        pygame.draw.rect(layer, NEON_GREEN, (WIDTH/2 - 100, HEIGHT/2 + 120, 200, 50), border_radius=10)
+        label = "CONTINUE" if self.final_level else "NEXT LEVEL"
+        continue_text = self.assets['text'].render('small', label, True, (30, 40, 60))
+        layer.blit(continue_text, (WIDTH/2 - continue_text.get_width()/2, HEIGHT/2 + 135))
 
-class GameOverState(GameState):
+class GameOverState(LayeredState):
     def __init__(self, manager):
         super().__init__(manager)
-        self.particles = []
+        self.particles = manager.particle_system(GAME_OVER)
         self.glitch_timer = 0
     
+    def enter(self):
+        self.manager.record_session(GAME_OVER)
+    
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN or (event.type == pygame.MOUSEBUTTONDOWN and event.button == 1):
             self.manager.change_state(MENU)
     
     def update(self):
+        rng = self.manager.rng.cosmetic
         # Create error particles
-        if random.random() < 0.2:
-            self.particles.append(Particle(
-                random.randint(0, WIDTH),
-                random.randint(0, HEIGHT),
-                RED if random.random() < 0.7 else (255, 100, 100),
-                random.randint(2, 5),
-                random.uniform(1, 3),
-                random.uniform(0, math.pi * 2)
-            ))
+        if rng.random() < 0.2:
+            self.particles.emit(
+                rng.randint(0, WIDTH),
+                rng.randint(0, HEIGHT),
+                RED if rng.random() < 0.7 else (255, 100, 100),
+                rng.randint(2, 5),
+                rng.uniform(1, 3),
+                rng.uniform(0, math.pi * 2)
+            )
         
         # Update particles
-        for particle in self.particles[:]:
-            if particle.update():
-                self.particles.remove(particle)
+        self.particles.update()
         
         # Update glitch timer
         self.glitch_timer += 1
     
-    def draw(self):
+    def needs_full_redraw(self):
+        # The red flash covers the screen, and so does clearing it next frame
+        return self.glitch_timer % 30 < 3
+    
+    def draw_below(self):
         # Draw glitch effect
         if self.glitch_timer % 30 < 2:
             self.screen.fill((255, 0, 0))
         
         # Draw particles
-        for particle in self.particles:
-            particle.draw(self.screen)
-        
+        self.particles.draw(self.screen)
+    
+    def build_foreground(self, layer):
         # Draw game over panel
-        pygame.draw.rect(self.screen, (60, 30, 30), (WIDTH/2 - 250, HEIGHT/2 - 150, 500, 300), border_radius=15)
-        pygame.draw.rect(self.screen, RED, (WIDTH/2 - 250, HEIGHT/2 - 150, 500, 300), 2, border_radius=15)
-        
-        # Draw game over text with glitch effect
-        game_over_text = self.assets['fonts']['large'].render("PROGRAM CRASHED!", True, RED)
-        self.screen.blit(game_over_text, (WIDTH/2 - game_over_text.get_width()/2 + random.randint(-5, 5), HEIGHT/2 - 100 + random.randint(-5, 5)))
+        pygame.draw.rect(layer, (60, 30, 30), (WIDTH/2 - 250, HEIGHT/2 - 150, 500, 300), border_radius=15)
+        pygame.draw.rect(layer, RED, (WIDTH/2 - 250, HEIGHT/2 - 150, 500, 300), 2, border_radius=15)
         
         # Draw retry button
-        pygame.draw.rect(self.screen, RED, (WIDTH/2 - 100, HEIGHT/2 + 50, 200, 50), border_radius=10)
-        retry_text = self.assets['fonts']['small'].render("RETRY", True, WHITE)
-        self.screen.blit(retry_text, (WIDTH/2 - retry_text.get_width()/2, HEIGHT/2 + 65))
+        pygame.draw.rect(layer, RED, (WIDTH/2 - 100, HEIGHT/2 + 50, 200, 50), border_radius=10)
+        retry_text = self.assets['text'].render('small', "RETRY", True, WHITE)
+        layer.blit(retry_text, (WIDTH/2 - retry_text.get_width()/2, HEIGHT/2 + 65))
+    
+    def draw_above(self):
+        # Draw game over text with glitch effect
+        game_over_text = self.assets['text'].render('large', "PROGRAM CRASHED!", True, RED)
+        return [self.screen.blit(game_over_text, (WIDTH/2 - game_over_text.get_width()/2 + self.manager.rng.cosmetic.randint(-5, 5), HEIGHT/2 - 100 + self.manager.rng.cosmetic.randint(-5, 5)))]
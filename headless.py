@@ -0,0 +1,92 @@
+import os
+
+# Headless mode never opens a window; SDL's dummy driver must be selected
+# before pygame initializes its video subsystem
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import time
+import pygame
+import game_objects
+import entities
+import game_states
+import level_gen
+import policies
+import settings
+from game_states import GameStateManager
+from input_provider import ScriptedInput
+from main import load_assets
+from settings import *
+
+def apply_overrides(overrides):
+    # Game modules star-import settings, so patch every module's copy
+    for name, value in overrides.items():
+        if not hasattr(settings, name):
+            raise KeyError(f"Unknown setting: {name}")
+        for module in (settings, entities, game_objects, game_states, level_gen, policies):
+            if hasattr(module, name):
+                setattr(module, name, value)
+
+# Steps GameplayState as fast as possible with no draw calls. Each step is
+# one fixed simulation tick (1/FPS of game time), so results do not depend
+# on how fast the host machine is.
+#
+# Levels are kept in memory only unless `cache_dir` is given: parallel
+# sweeps would otherwise all share (and prune) the game's level cache.
+class HeadlessRunner:
+    def __init__(self, input_provider=None, cache_dir=None):
+        pygame.display.init()
+        pygame.font.init()
+        self.input = input_provider if input_provider is not None else ScriptedInput()
+        screen = pygame.Surface((WIDTH, HEIGHT))
+        self.manager = GameStateManager(screen, load_assets(), self.input)
+        self.manager.level_store = level_gen.LevelStore(cache_dir)
+
+    @property
+    def state(self):
+        return self.manager.states[self.manager.current_state]
+
+    def start(self, seed=None, level=1):
+        # A seed makes the session reproducible; None draws a fresh one
+        self.manager.rng.next_seed = seed
+        self.manager.level = level
+        self.manager.change_state(GAMEPLAY)
+
+    def step(self, frames=1):
+        # Returns False once gameplay has ended (level complete or game over)
+        manager = self.manager
+        for _ in range(frames):
+            for event in self.input.get_events():
+                manager.handle_event(event)
+            manager.update()
+            if manager.current_state != GAMEPLAY:
+                return False
+        return True
+
+    def run(self, max_frames, policy=None, seed=None):
+        # `policy(state, input)` is called before every frame to script input
+        self.start(seed)
+        frames = 0
+        while frames < max_frames:
+            if policy is not None:
+                policy(self.state, self.input)
+            frames += 1
+            if not self.step():
+                break
+        return frames
+
+def main():
+    parser = argparse.ArgumentParser(description="Run gameplay headlessly and report throughput")
+    parser.add_argument('--frames', type=int, default=10000)
+    args = parser.parse_args()
+
+    runner = HeadlessRunner()
+    start = time.perf_counter()
+    frames = runner.run(args.frames)
+    elapsed = time.perf_counter() - start
+
+    print(f"{frames} frames in {elapsed:.3f}s ({frames / elapsed:.0f} frames/s)")
+    print(f"Final state: {runner.manager.current_state} {runner.manager.game_data}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import pygame
+from settings import *
+from sprite_cache import blit_batch
+
+BAR_WIDTH = 200
+BAR_HEIGHT = 20
+BAR_BACKGROUND = (50, 50, 50)
+HEALTH_COLOR = (255, 50, 50)
+
+# Layered compositor for the gameplay HUD. The static frame (bar
+# backgrounds, controls hint) and the scan-range circle are baked once;
+# the bar fills and counters are re-rendered only when the value they show
+# changes. Everything is then submitted as a single blit batch.
+class GameplayHud:
+    def __init__(self, assets):
+        self.text = assets['text']
+        self.frame = self._build_frame()
+        self.scan_circle = self._build_scan_circle()
+        self.scan_radius = Q_SCAN_RANGE
+        self.widgets = {}
+
+    def _build_frame(self):
+        background = pygame.Surface((BAR_WIDTH, BAR_HEIGHT), pygame.SRCALPHA)
+        pygame.draw.rect(background, BAR_BACKGROUND, (0, 0, BAR_WIDTH, BAR_HEIGHT), border_radius=5)
+        controls_text = self.text.render('small', "Q: Scan bugs | E: Fix bugs | Arrow keys: Move in all directions", True, WHITE)
+        return [
+            (background, (20, 20)),
+            (background, (WIDTH - 220, 20)),
+            (controls_text, (WIDTH/2 - controls_text.get_width()/2, HEIGHT - 40))
+        ]
+
+    def _build_scan_circle(self):
+        size = Q_SCAN_RANGE * 2
+        s = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.circle(s, (0, 195, 255, 30), (Q_SCAN_RANGE, Q_SCAN_RANGE), Q_SCAN_RANGE)
+        return s
+
+    def _bar(self, value, color, x):
+        blits = []
+        width = value * 2
+        if width < 0:
+            # pygame.draw.rect normalizes negative widths leftwards; keep that
+            x += width
+            width = -width
+        if width > 0:
+            fill = pygame.Surface((width, BAR_HEIGHT), pygame.SRCALPHA)
+            pygame.draw.rect(fill, color, (0, 0, width, BAR_HEIGHT), border_radius=5)
+            blits.append((fill, (x, 20)))
+        return blits
+
+    def _widget(self, name, value, build):
+        # Rebuild a widget's blits only when its value changes
+        cached = self.widgets.get(name)
+        if cached is None or cached[0] != value:
+            cached = (value, build(value))
+            self.widgets[name] = cached
+        return cached[1]
+
+    def _health(self, health):
+        health_text = self.text.render('small', f"Health: {health}", True, WHITE)
+        return self._bar(health, HEALTH_COLOR, 20) + [(health_text, (25, 45))]
+
+    def _energy(self, energy):
+        energy_text = self.text.render('small', f"Q-Energy: {energy}", True, WHITE)
+        return self._bar(energy, NEON_BLUE, WIDTH - 220) + [(energy_text, (WIDTH - 215, 45))]
+
+    def _bugs(self, bugs):
+        bug_text = self.text.render('small', f"Bugs: {bugs}", True, WHITE)
+        return [(bug_text, (WIDTH/2 - bug_text.get_width()/2, 20))]
+
+    def draw(self, screen, player, bugs, offset=(0, 0), scan_circle=True):
+        blit_batch(screen, self.frame
+                   + self._widget('health', player.health, self._health)
+                   + self._widget('energy', player.q_energy, self._energy)
+                   + self._widget('bugs', bugs, self._bugs))
+
+        # Draw scan range indicator (faint circle)
+        if not scan_circle:
+            return
+        screen.blit(self.scan_circle, (player.x - offset[0] + player.width/2 - self.scan_radius,
+                                       player.y - offset[1] + player.height/2 - self.scan_radius))
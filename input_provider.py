@@ -0,0 +1,51 @@
+import pygame
+
+# Input providers decouple the game logic from the physical keyboard. Every
+# provider exposes get_events() for discrete presses and get_pressed() for
+# held keys, mirroring pygame.event.get() and pygame.key.get_pressed().
+
+class KeyboardInput:
+    def get_events(self):
+        return pygame.event.get()
+
+    def get_pressed(self):
+        return pygame.key.get_pressed()
+
+class HeldKeys:
+    # Indexable like the sequence returned by pygame.key.get_pressed()
+    def __init__(self, keys=()):
+        self.keys = set(keys)
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+class ScriptedInput:
+    # Input driven from code, for headless runs and automated tests
+    def __init__(self):
+        self.held = HeldKeys()
+        self.pending = []
+
+    def hold(self, *keys):
+        self.held.keys.update(keys)
+
+    def release(self, *keys):
+        self.held.keys.difference_update(keys)
+
+    def set_held(self, keys):
+        self.held.keys.clear()
+        self.held.keys.update(keys)
+
+    def tap(self, key):
+        self.pending.append(pygame.event.Event(pygame.KEYDOWN, key=key))
+
+    def reset(self):
+        self.held.keys.clear()
+        self.pending = []
+
+    def get_events(self):
+        events = self.pending
+        self.pending = []
+        return events
+
+    def get_pressed(self):
+        return self.held
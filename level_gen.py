@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+import struct
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
+from settings import *
+
+# Procedural levels. A level is fully determined by its seed and a params
+# dict (a difficulty profile from LEVEL_PROFILES plus the world size), so
+# generated levels can be cached on disk and reloaded instead of rebuilt.
+#
+# Cache file layout: a fixed header (magic, version, seed, world size, data
+# byte and bug counts) followed by int32 (x, y) pairs for the data bytes
+# (centres) and then the bugs (top-left corners).
+
+MAGIC = b'CFLV'
+VERSION = 1
+HEADER = struct.Struct('<4sBQIIII')
+
+# Entities stay this far inside the world edges
+EDGE_MARGIN = 50
+
+class Level:
+    def __init__(self, seed, width, height, data_bytes, bugs):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.data_bytes = data_bytes
+        self.bugs = bugs
+
+def generate_level(seed, params):
+    # Jittered-grid placement: the world is cut into cells twice the minimum
+    # spacing and each cell holds at most one entity, offset within the
+    # cell's inner region so neighbours are always about `min_spacing` apart.
+    # Every cell lies inside the area the player can move through.
+    rng = np.random.default_rng(seed)
+    width = params['world_width']
+    height = params['world_height']
+    spacing = params['min_spacing']
+    cell = spacing * 2
+
+    cols = max(0, (width - EDGE_MARGIN * 2) // cell)
+    rows = max(0, (height - EDGE_MARGIN * 2) // cell)
+    origin_x, origin_y = np.meshgrid(EDGE_MARGIN + np.arange(cols) * cell,
+                                     EDGE_MARGIN + np.arange(rows) * cell)
+    origins = np.column_stack((origin_x.ravel(), origin_y.ravel()))
+
+    # Counts scale with the number of screen-sized sectors in the world
+    sectors = max(1, round(width * height / (WIDTH * HEIGHT)))
+    bug_count = params['bugs_per_sector'] * sectors
+    byte_count = params['bytes_per_sector'] * sectors
+
+    # Bugs may not start on top of the player
+    spawn_x = PLAYER_START[0] + PLAYER_WIDTH / 2
+    spawn_y = PLAYER_START[1] + PLAYER_HEIGHT / 2
+    centre = origins + cell / 2
+    bug_ok = np.hypot(centre[:, 0] - spawn_x, centre[:, 1] - spawn_y) >= params['spawn_clearance']
+
+    # Dense profiles on small worlds get as many entities as there are cells
+    order = rng.permutation(len(origins))
+    bug_cells = order[bug_ok[order]][:bug_count]
+    taken = np.zeros(len(origins), dtype=bool)
+    taken[bug_cells] = True
+    byte_cells = order[~taken[order]][:byte_count]
+
+    def place(cells):
+        jitter = rng.random((len(cells), 2)) * spacing
+        return (origins[cells] + spacing / 2 + jitter).astype(np.int32)
+
+    bugs = place(bug_cells) - np.array([BUG_WIDTH // 2, BUG_HEIGHT // 2], dtype=np.int32)
+    return Level(seed, width, height, place(byte_cells), bugs)
+
+def cache_key(seed, params):
+    # Besides the params, generation reads these settings; changing any of
+    # them must not serve levels generated under the old values
+    inputs = {'player_start': list(PLAYER_START), 'player_size': [PLAYER_WIDTH, PLAYER_HEIGHT],
+              'sector_size': [WIDTH, HEIGHT], 'bug_size': [BUG_WIDTH, BUG_HEIGHT], 'edge_margin': EDGE_MARGIN}
+    blob = json.dumps({'version': VERSION, 'seed': seed, 'params': params, 'inputs': inputs}, sort_keys=True)
+    return hashlib.sha1(blob.encode()).hexdigest()[:20]
+
+def write_level(path, level):
+    # Written to a temporary file first so readers never see a partial level
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, level.seed, level.width, level.height,
+                            len(level.data_bytes), len(level.bugs)))
+        f.write(level.data_bytes.astype('<i4').tobytes())
+        f.write(level.bugs.astype('<i4').tobytes())
+    os.replace(tmp_path, path)
+
+def read_level(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, seed, width, height, byte_count, bug_count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a CodeFlow level (version {VERSION})")
+    points = np.frombuffer(data, dtype='<i4', offset=HEADER.size).reshape(-1, 2)
+    return Level(seed, width, height, points[:byte_count], points[byte_count:byte_count + bug_count])
+
+# Generated levels, looked up in memory, then on disk, then generated.
+# prefetch() builds a level on a background thread (e.g. while the loading
+# screen is shown); a later get() for the same level waits for that result.
+class LevelStore:
+    def __init__(self, cache_dir=LEVEL_CACHE_DIR, max_files=LEVEL_CACHE_FILES, max_memory=4):
+        self.cache_dir = cache_dir
+        self.max_files = max_files
+        self.max_memory = max_memory
+        self.levels = OrderedDict()
+        self.pending = {}
+        self.executor = None
+        self.hits = 0
+        self.misses = 0
+
+    def prefetch(self, seed, params):
+        key = cache_key(seed, params)
+        future = self.pending.get(key)
+        if future is None and key in self.levels:
+            # Already in memory
+            future = Future()
+            future.set_result(self.levels[key])
+        elif future is None:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='level-gen')
+            future = self.executor.submit(self._load, key, seed, params)
+            self.pending[key] = future
+        return future
+
+    def get(self, seed, params):
+        key = cache_key(seed, params)
+        level = self.levels.get(key)
+        if level is None:
+            future = self.pending.pop(key, None)
+            level = future.result() if future is not None else self._load(key, seed, params)
+            self.levels[key] = level
+            if len(self.levels) > self.max_memory:
+                self.levels.popitem(last=False)
+        self.levels.move_to_end(key)
+        return level
+
+    def _load(self, key, seed, params):
+        path = os.path.join(self.cache_dir, f"{key}.cfl") if self.cache_dir else None
+        if path is not None and os.path.exists(path):
+            try:
+                level = read_level(path)
+                self.hits += 1
+                return level
+            except (OSError, ValueError, struct.error):
+                pass  # Unreadable or stale cache entry: regenerate it
+
+        self.misses += 1
+        level = generate_level(seed, params)
+        if path is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            write_level(path, level)
+            self._prune()
+        return level
+
+    def _prune(self):
+        # Keep only the most recently written cache files
+        # Other processes may share the cache directory and remove files at
+        # any point, so a file that has gone is simply skipped
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.cfl'):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    files.append((os.path.getmtime(path), path))
+                except OSError:
+                    pass
+        if len(files) <= self.max_files:
+            return
+        files.sort()
+        for _, path in files[:len(files) - self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,107 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+from settings import *
+from sprite_cache import circle_keys, render_circle
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.gif')
+SOUND_EXTENSIONS = ('.wav', '.ogg', '.mp3')
+
+# Particle sprites used during gameplay, pre-rendered while loading
+GAMEPLAY_SPRITES = (((NEON_BLUE,), range(2, 7)), ((NEON_GREEN,), range(3, 9)))
+
+# Background loading pipeline. Each job's `work` runs on the thread pool and
+# its optional `apply(result)` runs on the main thread in poll(), so shared
+# caches and the display are only ever touched from one thread. Jobs that
+# must call into SDL_ttf (which is not thread safe) run on the main thread
+# too, a few per frame within a time budget. Progress is the finished share
+# of the jobs' weights.
+class Loader:
+    def __init__(self, workers=LOADER_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='loader')
+        self.reset()
+
+    def reset(self):
+        self.jobs = []
+        self.total = 0
+        self.completed = 0
+
+    def add(self, weight, work, apply=None, main_thread=False):
+        future = None if main_thread else self.executor.submit(work)
+        self.add_future(weight, future, apply, work)
+
+    def add_future(self, weight, future, apply=None, work=None):
+        self.jobs.append((weight, future, work, apply))
+        self.total += weight
+
+    @property
+    def progress(self):
+        return self.completed / self.total if self.total else 1.0
+
+    def done(self):
+        return not self.jobs
+
+    def poll(self, budget_ms=LOADER_FRAME_BUDGET_MS):
+        # Finish whatever is ready without blocking; returns True when done
+        deadline = time.perf_counter() + budget_ms / 1000
+        ran_main = False
+        pending = []
+        for job in self.jobs:
+            weight, future, work, apply = job
+            if future is None:
+                # At least one main-thread job per frame, so loading always advances
+                if ran_main and time.perf_counter() >= deadline:
+                    pending.append(job)
+                    continue
+                ran_main = True
+                result = work()
+            elif future.done():
+                result = future.result()
+            else:
+                pending.append(job)
+                continue
+            if apply is not None:
+                apply(result)
+            self.completed += weight
+        self.jobs = pending
+        return not self.jobs
+
+def queue_asset_jobs(loader, assets):
+    # Decode files from assets/ and pre-render the gameplay sprites and HUD text
+    images = assets['images']
+    sounds = assets['sounds']
+    for name in sorted(os.listdir(ASSET_DIR)):
+        path = os.path.join(ASSET_DIR, name)
+        key, extension = os.path.splitext(name)
+        extension = extension.lower()
+        if extension in IMAGE_EXTENSIONS:
+            # convert_alpha() needs the display, so it happens on the main thread
+            loader.add(2, lambda path=path: pygame.image.load(path),
+                       lambda image, key=key: images.update({key: image.convert_alpha()}))
+        elif extension in SOUND_EXTENSIONS:
+            # The mixer is only started once there is something to play
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            loader.add(2, lambda path=path: pygame.mixer.Sound(path),
+                       lambda sound, key=key: sounds.update({key: sound}))
+
+    sprites = assets['sprites']
+    def add_sprites(rendered):
+        for key, sprite in rendered:
+            sprites.add(key, sprite)
+    for colors, sizes in GAMEPLAY_SPRITES:
+        keys = circle_keys(colors, sizes)
+        loader.add(1, lambda keys=keys: [(key, render_circle(*key)) for key in keys], add_sprites)
+
+    # HUD counters for every health and energy value, 25 values per job
+    text = assets['text']
+    def render_labels(label, values):
+        for value in values:
+            text.render('small', f"{label}: {value}", True, WHITE)
+    for label, maximum in (("Health", PLAYER_MAX_HEALTH), ("Q-Energy", PLAYER_MAX_ENERGY)):
+        for start in range(0, maximum + 1, 25):
+            values = range(start, min(start + 25, maximum + 1))
+            loader.add(1, lambda label=label, values=values: render_labels(label, values),
+                       main_thread=True)
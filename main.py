@@ -1,58 +1,262 @@
+import time
+
+# Taken before anything heavy is imported; the startup report counts from here
+STARTUP_START = time.perf_counter()
+
 import pygame
+import argparse
 import sys
 import os
-from game_states import GameStateManager
+from concurrent.futures import ThreadPoolExecutor
+from input_provider import KeyboardInput
+from profiler import EVENTS, UPDATE, CLEAR, DRAW, OVERLAY, FLIP
+from sprite_cache import SpriteCache
+from text_cache import TextCache
 from settings import *
 
-# Initialize pygame
-pygame.init()
-pygame.mixer.init()
+FONT_SIZES = {'large': 72, 'medium': 48, 'small': 32}
+
+def load_fonts():
+    return {name: pygame.font.Font(None, size) for name, size in FONT_SIZES.items()}
+
+def bootstrap():
+    # Shared by main.py and simple_game.py. Only the subsystems the game uses
+    # are initialized; the loading screen starts the mixer if there are sounds.
+    # Fonts are opened on a worker thread while the window is created;
+    # returns the screen and a future for the fonts.
+    pygame.display.init()
+    pygame.font.init()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fonts')
+    fonts = executor.submit(load_fonts)
+    executor.shutdown(wait=False)
+
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("CodeFlow: The Debugging Odyssey")
+    return screen, fonts
+
+# Wall-clock time of each startup phase, up to the first presented frame
+class StartupReport:
+    def __init__(self, start=STARTUP_START):
+        self.marks = [('start', start)]
 
-# Create screen
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("CodeFlow: The Debugging Odyssey")
+    def mark(self, phase):
+        self.marks.append((phase, time.perf_counter()))
+
+    def phases(self):
+        return [(phase, (end - start) * 1000) for (_, start), (phase, end) in zip(self.marks, self.marks[1:])]
+
+    def write(self, path):
+        total = (self.marks[-1][1] - self.marks[0][1]) * 1000
+        if path == '-':
+            for phase, ms in self.phases():
+                print(f"{phase:<16} {ms:8.1f} ms")
+            print(f"{'total':<16} {total:8.1f} ms", flush=True)
+        else:
+            import json
+            with open(path, 'w') as f:
+                json.dump({'phases_ms': dict(self.phases()), 'first_frame_ms': total}, f, indent=2)
 
 # Load assets
-def load_assets():
+def load_assets(fonts=None):
     assets = {
-        'fonts': {
-            'large': pygame.font.Font(None, 72),
-            'medium': pygame.font.Font(None, 48),
-            'small': pygame.font.Font(None, 32)
-        }
+        'fonts': fonts if fonts is not None else load_fonts(),
+        'sprites': SpriteCache(),
+        # Filled from assets/ by the loading screen
+        'images': {},
+        'sounds': {}
     }
+    assets['text'] = TextCache(assets['fonts'])
     return assets
 
+# Asyncio variant of the main loop (main.py --asyncio): frames are paced by
+# sleeping on the event loop, so background tasks run between frames
+# instead of the loop blocking in clock.tick()
+async def run_async(frame, tasks):
+    import asyncio
+    loop = asyncio.get_running_loop()
+    tasks.attach(loop)
+    step = 1 / FPS
+    next_frame = loop.time()
+    while frame():
+        next_frame += step
+        delay = next_frame - loop.time()
+        if delay < -step:
+            # More than a frame behind: start pacing afresh rather than rushing
+            next_frame = loop.time()
+        # Sleeping for zero still lets ready tasks run
+        await asyncio.sleep(max(0, delay))
+    await tasks.drain()
+
 # Main game function
 def main():
+    parser = argparse.ArgumentParser(description="CodeFlow: The Debugging Odyssey")
+    parser.add_argument('--seed', type=int, help="Seed for reproducible sessions")
+    parser.add_argument('--record', metavar='DIR', help="Record every gameplay session's input to DIR")
+    parser.add_argument('--profile', action='store_true', help="Start with the frame profiler enabled (F3)")
+    parser.add_argument('--dirty-rects', action='store_true', default=DIRTY_RECTS,
+                        help="Only redraw changed screen regions on static screens")
+    parser.add_argument('--startup-report', nargs='?', const='-', metavar='FILE',
+                        help="Print startup phase timings, or write them to FILE as JSON")
+    parser.add_argument('--telemetry', metavar='DIR', default=TELEMETRY_DIR,
+                        help="Log frame timings and gameplay events to rotating files in DIR")
+    parser.add_argument('--scores', metavar='PATH', default=SCORE_DB,
+                        help="Store finished sessions and high scores in this SQLite database")
+    parser.add_argument('--no-scores', dest='scores', action='store_const', const=None,
+                        help="Do not store finished sessions")
+    parser.add_argument('--asyncio', action='store_true', default=ASYNC_LOOP,
+                        help="Run the main loop on asyncio so background tasks overlap with frames")
+    parser.add_argument('--pipelined', action='store_true', default=PIPELINED,
+                        help="Simulate on a separate thread and draw interpolated snapshots")
+    parser.add_argument('--fixed-quality', action='store_true', default=not ADAPTIVE_QUALITY,
+                        help="Keep the best quality tier instead of adapting it to the frame time")
+    args = parser.parse_args()
+    startup = StartupReport()
+    startup.mark('imports')
+
+    # Initialize pygame and create screen
+    screen, fonts = bootstrap()
+    startup.mark('display')
+
+    # Imported here so the import overlaps with opening the fonts
+    from game_states import GameStateManager
+    startup.mark('game modules')
+
     clock = pygame.time.Clock()
-    assets = load_assets()
-    
+    assets = load_assets(fonts.result())
+    input_provider = KeyboardInput()
+    startup.mark('assets')
+
     # Create game state manager
-    game_state_manager = GameStateManager(screen, assets)
-    
-    # Main game loop
-    running = True
-    while running:
+    game_state_manager = GameStateManager(screen, assets, input_provider, args.seed)
+    if args.record:
+        from replay import ReplayRecorder
+        game_state_manager.recorder = ReplayRecorder(args.record, game_state_manager.tasks)
+    if args.telemetry:
+        from telemetry import Telemetry
+        game_state_manager.telemetry = Telemetry(args.telemetry)
+    if args.scores:
+        from scores import ScoreStore
+        game_state_manager.scores = ScoreStore(args.scores)
+    telemetry = game_state_manager.telemetry
+    profiler = game_state_manager.profiler
+    if args.profile:
+        profiler.toggle()
+    governor = None
+    if not args.fixed_quality:
+        from quality import QualityGovernor
+        governor = QualityGovernor()
+    startup.mark('state manager')
+
+    # Fixed-timestep loop: the simulation advances in steps of 1/FPS seconds
+    # regardless of how long rendering takes. A frame can run zero or
+    # several steps, so it is drawn interpolated between the last two ticks
+    # by the time left over in the accumulator, like pipelined snapshots
+    step_ms = 1000 / FPS
+    accumulator = step_ms
+    previous = time.perf_counter()
+
+    # Pipelined mode: updates run on the simulation thread and this loop
+    # only forwards events and draws its snapshots
+    simulation = None
+    if args.pipelined:
+        from pipeline import SimulationThread
+        simulation = SimulationThread(game_state_manager)
+        simulation.start()
+
+    # One iteration of the main loop; returns False once the game should exit
+    def frame():
+        nonlocal accumulator, previous, startup
+        running = True
+        now = time.perf_counter()
+        accumulator = min(accumulator + (now - previous) * 1000, step_ms * MAX_UPDATES_PER_FRAME)
+        previous = now
+        profiler.begin_frame()
+
         # Handle events
-        for event in pygame.event.get():
+        for event in input_provider.get_events():
             if event.type == pygame.QUIT:
                 running = False
-            
+
             # Pass events to current state
-            game_state_manager.handle_event(event)
-        
+            if simulation is not None:
+                simulation.post(event)
+            else:
+                game_state_manager.handle_event(event)
+        profiler.mark(EVENTS)
+
         # Update current state
-        game_state_manager.update()
-        
+        if simulation is None:
+            while accumulator >= step_ms:
+                game_state_manager.update()
+                accumulator -= step_ms
+        elif not simulation.running:
+            running = False
+        profiler.mark(UPDATE)
+
         # Draw current state
-        screen.fill(DARK_BLUE)
-        game_state_manager.draw()
-        
+        if simulation is not None:
+            dirty = None
+            snapshot, alpha = simulation.acquire()
+            screen.fill(DARK_BLUE)
+            profiler.mark(CLEAR)
+            if snapshot is not None:
+                snapshot.draw(alpha)
+            simulation.release()
+            profiler.mark(DRAW)
+            game_state_manager.draw_overlay()
+            profiler.mark(OVERLAY)
+        elif args.dirty_rects and not profiler.enabled:
+            dirty = game_state_manager.draw_dirty(accumulator / step_ms)
+        else:
+            dirty = None
+            screen.fill(DARK_BLUE)
+            profiler.mark(CLEAR)
+            game_state_manager.draw(accumulator / step_ms)
+            profiler.mark(DRAW)
+            game_state_manager.draw_overlay()
+            profiler.mark(OVERLAY)
+
         # Update display
-        pygame.display.flip()
-        clock.tick(FPS)
-    
+        if dirty is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+        profiler.mark(FLIP)
+        profiler.end_frame(game_state_manager.current_state, game_state_manager.particle_count())
+        work = time.perf_counter() - now
+        if governor is not None and governor.record(work * 1000):
+            game_state_manager.set_quality(governor.tier)
+        if telemetry is not None:
+            telemetry.frame(int(work * 1e9), game_state_manager.current_state,
+                            governor.level if governor is not None else 0,
+                            game_state_manager.particle_count(), game_state_manager.entity_count())
+        if startup is not None:
+            startup.mark('first frame')
+            if args.startup_report:
+                startup.write(args.startup_report)
+            startup = None
+        if not running and simulation is not None:
+            # Stopped while the event loop still runs and before the tasks
+            # close, so it cannot submit work or dispatch callbacks to them
+            simulation.stop()
+        return running
+
+    if args.asyncio:
+        import asyncio
+        asyncio.run(run_async(frame, game_state_manager.tasks))
+    else:
+        # Background tasks get a turn once per frame
+        while frame():
+            game_state_manager.tasks.poll()
+            clock.tick(FPS)
+    game_state_manager.tasks.close()
+
+    if simulation is not None and simulation.error is not None:
+        raise simulation.error
+    if telemetry is not None:
+        telemetry.close()
+    if game_state_manager.scores is not None:
+        game_state_manager.scores.close()
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,237 @@
+import math
+import numpy as np
+import pygame
+from sprite_cache import SpriteCache, ALPHA_STEP, blit_batch
+
+# Structure-of-arrays particle engine. Every particle lives in a slot of a
+# set of parallel NumPy arrays, so spawning, moving and culling happen for
+# the whole batch at once instead of per Python object.
+#
+# Slots are recycled: storage only grows up to the system's budget and
+# update() compacts survivors through preallocated scratch arrays, so a
+# system that has reached its peak allocates nothing frame to frame. When a
+# burst would exceed the budget, the particles closest to fading out (the
+# lowest lifetime, and so the lowest alpha) make room for it.
+class ParticleSystem:
+    def __init__(self, sprites=None, capacity=256, rng=None, budget=None, shared=None):
+        self.sprites = sprites if sprites is not None else SpriteCache()
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.budget = budget
+        self.shared = shared
+        # Quality settings (see GameStateManager.set_quality)
+        self.spawn_rate = 1.0
+        self.alpha = True
+        # Ticks to move particles along their velocity when drawing; the
+        # pipelined renderer uses it to interpolate between ticks
+        self.advance = 0.0
+        if shared is not None:
+            shared.systems.append(self)
+        self.count = 0
+        self.dropped = 0
+        self.palette = []
+        self.palette_index = {}
+        self._allocate(capacity if budget is None else min(capacity, budget))
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.vx = np.zeros(capacity, dtype=np.float32)
+        self.vy = np.zeros(capacity, dtype=np.float32)
+        self.lifetime = np.zeros(capacity, dtype=np.int16)
+        self.size = np.zeros(capacity, dtype=np.int16)
+        self.color = np.zeros(capacity, dtype=np.uint8)
+        # Scratch space for compaction in update()
+        self.alive = np.zeros(capacity, dtype=np.bool_)
+        self.scratch = {dtype: np.zeros(capacity, dtype=dtype)
+                        for dtype in (np.float32, np.int16, np.uint8)}
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        if self.budget is not None:
+            capacity = min(capacity, self.budget)
+        old = self._arrays()
+        self._allocate(capacity)
+        for src, dst in zip(old, self._arrays()):
+            dst[:self.count] = src[:self.count]
+
+    def _arrays(self):
+        return (self.x, self.y, self.vx, self.vy, self.lifetime, self.size, self.color)
+
+    def limit(self):
+        # Particles this system may hold right now, or None when unbounded
+        limit = self.budget
+        if self.shared is not None:
+            room = max(0, self.shared.limit - self.shared.live() + self.count)
+            limit = room if limit is None else min(limit, room)
+        return limit
+
+    def _color_id(self, color):
+        color = tuple(color)
+        if color not in self.palette_index:
+            self.palette_index[color] = len(self.palette)
+            self.palette.append(color)
+        return self.palette_index[color]
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def snapshot_copy(self):
+        # An empty system to mirror this one into with copy_from()
+        return ParticleSystem(self.sprites, self.capacity)
+
+    def copy_from(self, other):
+        n = other.count
+        if n > self.capacity:
+            self._grow(n)
+        for dst, src in zip(self._arrays(), other._arrays()):
+            np.copyto(dst[:n], src[:n])
+        self.count = n
+        self.palette = other.palette
+        self.alpha = other.alpha
+
+    def emit(self, x, y, color, size, speed, direction):
+        # Spawn a single particle, same arguments as the old Particle class
+        self.emit_burst(x, y, color, 1, size, speed, direction)
+
+    def emit_burst(self, x, y, color, count, size, speed, direction=None):
+        # Spawn `count` particles in one go. `size` and `speed` may be scalars
+        # or (low, high) ranges; `direction` may be a scalar, an array of
+        # angles or None for uniformly random directions. `x` and `y` may be
+        # arrays of length `count` to spawn from several origins at once.
+        if self.spawn_rate < 1 and count > 0:
+            # Stochastic rounding keeps single-particle emitters going
+            spawned = int(count * self.spawn_rate + self.rng.random())
+            x, y, direction = self._thin(spawned, count, x, y, direction)
+            count = spawned
+        limit = self.limit()
+        if limit is not None and self.count + count > limit:
+            kept = self._make_room(count, limit)
+            x, y, direction = self._thin(kept, count, x, y, direction)
+            count = kept
+        if count <= 0:
+            return
+        start = self.count
+        end = start + count
+        if end > self.capacity:
+            self._grow(end)
+
+        rng = self.rng
+        if isinstance(size, tuple):
+            size = rng.integers(size[0], size[1] + 1, count)
+        if isinstance(speed, tuple):
+            speed = rng.uniform(speed[0], speed[1], count)
+        if direction is None:
+            direction = rng.uniform(0, math.pi * 2, count)
+
+        self.x[start:end] = x
+        self.y[start:end] = y
+        self.vx[start:end] = np.cos(direction) * speed
+        self.vy[start:end] = np.sin(direction) * speed
+        self.lifetime[start:end] = rng.integers(30, 91, count)
+        self.size[start:end] = size
+        self.color[start:end] = self._color_id(color)
+        self.count = end
+
+    def _thin(self, count, total, *values):
+        # Per-particle arrays cut down from `total` to `count` particles,
+        # picked evenly across the burst so rings stay whole and every origin
+        # of a multi-origin burst keeps its share
+        if count >= total:
+            return values
+        picked = np.arange(max(count, 0)) * total // max(count, 1)
+        return [np.asarray(value)[picked] if np.ndim(value) else value for value in values]
+
+    def update(self):
+        n = self.count
+        if n == 0:
+            return
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+        self.lifetime[:n] -= 1
+
+        # Masked compaction: keep the survivors packed at the front
+        alive = np.greater(self.lifetime[:n], 0, out=self.alive[:n])
+        self._compact(alive)
+
+    def _compact(self, keep):
+        n = self.count
+        survivors = int(np.count_nonzero(keep))
+        if survivors == n:
+            return
+        for arr in self._arrays():
+            packed = np.compress(keep, arr[:n], out=self.scratch[arr.dtype.type][:survivors])
+            arr[:survivors] = packed
+        self.count = survivors
+
+    def _make_room(self, count, limit):
+        # Drops the particles nearest to fading out so `count` new ones fit;
+        # returns how many of the new particles can be spawned
+        count = min(count, limit)
+        excess = self.count + count - limit
+        if excess > 0:
+            n = self.count
+            keep = self.alive[:n]
+            keep[:] = True
+            keep[np.argpartition(self.lifetime[:n], excess - 1)[:excess]] = False
+            self._compact(keep)
+            self.dropped += excess
+        return count
+
+    def rects(self):
+        # Screen rects the next draw() will cover, padded for subpixel offsets
+        n = self.count
+        size = self.size[:n].astype(np.int32)
+        left = np.floor(self.x[:n]).astype(np.int32) - size - 1
+        top = np.floor(self.y[:n]).astype(np.int32) - size - 1
+        side = size * 2 + 2
+        return [pygame.Rect(l, t, s, s) for l, t, s in zip(left.tolist(), top.tolist(), side.tolist())]
+
+    def draw(self, screen, offset=(0, 0), scale=1.0):
+        # `scale` below 1 draws onto a reduced-resolution scene surface
+        n = self.count
+        if n == 0:
+            return
+        xs = self.x[:n]
+        ys = self.y[:n]
+        sizes = self.size[:n]
+        if self.advance:
+            xs = xs + self.vx[:n] * self.advance
+            ys = ys + self.vy[:n] * self.advance
+        palette = self.palette
+        circle = self.sprites.circle
+        ox, oy = offset
+        if scale != 1:
+            xs = (xs - ox) * scale
+            ys = (ys - oy) * scale
+            sizes = np.maximum(1, np.rint(sizes * scale)).astype(np.int16)
+            ox = oy = 0
+        if not self.alpha:
+            blit_batch(screen, [
+                (circle(palette[color], size, None), (x - size - ox, y - size - oy))
+                for x, y, size, color in zip(xs.tolist(), ys.tolist(),
+                                             sizes.tolist(), self.color[:n].tolist())
+            ])
+            return
+        alpha_levels = (np.minimum(255, self.lifetime[:n] * 3) + ALPHA_STEP // 2) // ALPHA_STEP
+        blit_batch(screen, [
+            (circle(palette[color], size, alpha), (x - size - ox, y - size - oy))
+            for x, y, size, color, alpha in zip(xs.tolist(), ys.tolist(),
+                                                sizes.tolist(), self.color[:n].tolist(),
+                                                alpha_levels.tolist())
+        ])
+
+# Global particle budget shared by the systems of every game state; a
+# system's own budget is further limited to what the others leave free.
+class ParticleBudget:
+    def __init__(self, limit):
+        self.limit = limit
+        self.systems = []
+
+    def live(self):
+        return sum(system.count for system in self.systems)
@@ -0,0 +1,130 @@
+import copy
+import queue
+import threading
+import time
+from settings import *
+
+# Pipelined mode (main.py --pipelined): the simulation ticks at FPS on its
+# own thread and publishes snapshots, and the main thread draws the latest
+# one, interpolated to the moment it is drawn. A snapshot holds render-side
+# copies of the game states (see GameState.snapshot_copies) that are built
+# once and refreshed in place every tick, so publishing copies arrays into
+# existing buffers instead of building new entity lists.
+class Snapshot:
+    def __init__(self):
+        self.state_id = None
+        self.published = 0.0
+        self.copies = {}
+
+    def capture(self, state_id, state):
+        copied = self.copies.get(state_id)
+        if copied is None:
+            copied = object.__new__(type(state))
+            for name, value in state.render_owned.items():
+                setattr(copied, name, copy.copy(value))
+        owned = state.render_owned
+        mirrored = state.snapshot_copies
+        for name, value in vars(state).items():
+            if name in mirrored:
+                mirror = copied.__dict__.get(name)
+                if hasattr(value, 'copy_from'):
+                    if mirror is None:
+                        mirror = value.snapshot_copy()
+                        setattr(copied, name, mirror)
+                    mirror.copy_from(value)
+                elif mirror is None:
+                    setattr(copied, name, copy.copy(value))
+                else:
+                    vars(mirror).update(vars(value))
+            elif name not in owned:
+                setattr(copied, name, value)
+        self.copies[state_id] = copied
+        self.state_id = state_id
+        self.published = time.perf_counter()
+
+    def draw(self, alpha):
+        state = self.copies[self.state_id]
+        state.interpolate(alpha)
+        state.draw()
+
+class SimulationThread(threading.Thread):
+    def __init__(self, manager):
+        super().__init__(name='simulation', daemon=True)
+        self.manager = manager
+        self.events = queue.SimpleQueue()
+        # Background task callbacks, run on this thread between ticks
+        self.calls = queue.SimpleQueue()
+        manager.tasks.dispatch = self.call
+        # Double buffer: the simulation only writes the snapshot the
+        # renderer is not drawing
+        self.buffers = (Snapshot(), Snapshot())
+        self.lock = threading.Lock()
+        self.latest = None
+        self.in_use = None
+        self.running = True
+        self.error = None
+
+    def post(self, event):
+        self.events.put(event)
+
+    def call(self, function, *args):
+        self.calls.put((function, args))
+
+    def stop(self):
+        self.running = False
+        self.join()
+        # From here on the main thread is the only one left
+        self.manager.tasks.dispatch = None
+        while not self.calls.empty():
+            function, args = self.calls.get()
+            function(*args)
+
+    def run(self):
+        manager = self.manager
+        step = 1 / FPS
+        next_tick = time.perf_counter()
+        try:
+            while self.running:
+                while not self.events.empty():
+                    manager.handle_event(self.events.get())
+                while not self.calls.empty():
+                    function, args = self.calls.get()
+                    function(*args)
+                manager.update()
+                self.publish()
+
+                next_tick += step
+                delay = next_tick - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < -step * MAX_UPDATES_PER_FRAME:
+                    # Too far behind to catch up; drop the backlog
+                    next_tick = time.perf_counter()
+        except Exception as error:
+            self.error = error
+        finally:
+            self.running = False
+
+    def publish(self):
+        with self.lock:
+            target = self.buffers[1] if self.buffers[0] is self.latest else self.buffers[0]
+            if target is self.in_use:
+                # The renderer still holds the older snapshot: refresh the
+                # latest one instead, leaving the older one current meanwhile
+                target, self.latest = self.latest, self.in_use
+        target.capture(self.manager.current_state, self.manager.states[self.manager.current_state])
+        with self.lock:
+            self.latest = target
+
+    def acquire(self):
+        # The latest snapshot and how far the renderer is past it, in ticks;
+        # the snapshot stays untouched until release()
+        with self.lock:
+            self.in_use = self.latest
+        if self.in_use is None:
+            return None, 1.0
+        return self.in_use, min(1.0, (time.perf_counter() - self.in_use.published) * FPS)
+
+    def release(self):
+        with self.lock:
+            self.in_use = None
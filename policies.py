@@ -0,0 +1,63 @@
+import pygame
+from settings import *
+
+# Scripted input policies for headless runs. A policy is called once per
+# frame with the GameplayState and a ScriptedInput and decides which keys
+# to hold and tap.
+
+def idle_policy(state, controls):
+    controls.set_held(())
+
+def _nearest(x, y, objects, offset_x=0, offset_y=0):
+    best = None
+    best_dist = None
+    for obj in objects:
+        dx = obj.x + offset_x - x
+        dy = obj.y + offset_y - y
+        dist = dx * dx + dy * dy
+        if best_dist is None or dist < best_dist:
+            best = obj
+            best_dist = dist
+    return best, best_dist
+
+def _steer(controls, x, y, target_x, target_y):
+    held = []
+    if target_x < x - PLAYER_SPEED:
+        held.append(pygame.K_LEFT)
+    elif target_x > x + PLAYER_SPEED:
+        held.append(pygame.K_RIGHT)
+    if target_y < y - PLAYER_SPEED:
+        held.append(pygame.K_UP)
+    elif target_y > y + PLAYER_SPEED:
+        held.append(pygame.K_DOWN)
+    controls.set_held(held)
+
+def greedy_policy(state, controls):
+    # Head for the nearest bug and scan+fix it once in range; detour to the
+    # nearest data byte whenever there is not enough energy for a fix
+    player = state.player
+    px = player.x + player.width/2
+    py = player.y + player.height/2
+
+    if player.q_energy < Q_FIX_ENERGY_COST and state.data_bytes:
+        byte, _ = _nearest(px, py, state.data_bytes)
+        _steer(controls, px, py, byte.x, byte.y)
+        return
+
+    bug, dist = _nearest(player.x, player.y, state.bugs)
+    if bug is None:
+        controls.set_held(())
+        return
+    if dist < (Q_SCAN_RANGE * 0.8) ** 2:
+        controls.set_held(())
+        # Abilities are keypresses; space them out like a human would
+        if state.frame % 15 == 0:
+            controls.tap(pygame.K_q)
+            controls.tap(pygame.K_e)
+        return
+    _steer(controls, px, py, bug.x + bug.width/2, bug.y + bug.height/2)
+
+POLICIES = {
+    'idle': idle_policy,
+    'greedy': greedy_policy
+}
@@ -0,0 +1,142 @@
+import json
+import time
+import numpy as np
+import pygame
+from settings import *
+from sprite_cache import blit_stats
+
+# Frame phases timed by the main loop, in order
+PHASES = ('events', 'update', 'clear', 'draw', 'overlay', 'flip')
+EVENTS, UPDATE, CLEAR, DRAW, OVERLAY, FLIP = range(len(PHASES))
+
+# Frames between overlay text refreshes
+OVERLAY_REFRESH = 15
+
+# Per-frame, per-phase timings recorded with perf_counter_ns into a fixed
+# ring buffer. While disabled every hook returns after a single attribute
+# check, so the instrumentation can stay in the main loop permanently.
+class FrameProfiler:
+    def __init__(self, capacity=PROFILER_FRAMES):
+        self.enabled = False
+        self.capacity = capacity
+        self.phases = np.zeros((capacity, len(PHASES)), dtype=np.int64)
+        self.totals = np.zeros(capacity, dtype=np.int64)
+        self.starts = np.zeros(capacity, dtype=np.int64)
+        self.states = np.zeros(capacity, dtype=np.int8)
+        self.particles = np.zeros(capacity, dtype=np.int32)
+        self.blits = np.zeros(capacity, dtype=np.int32)
+        self.index = 0
+        self.count = 0
+        self.frame_start = 0
+        self.last_mark = 0
+        self.overlay = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.index = 0
+        self.count = 0
+        self.overlay = None
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.frame_start = self.last_mark = time.perf_counter_ns()
+        self.phases[self.index] = 0
+        blit_stats.reset()
+
+    def mark(self, phase):
+        # Attribute the time since the previous mark to `phase`
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        self.phases[self.index, phase] += now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self, state, particle_count):
+        if not self.enabled:
+            return
+        i = self.index
+        self.totals[i] = time.perf_counter_ns() - self.frame_start
+        self.starts[i] = self.frame_start
+        self.states[i] = state
+        self.particles[i] = particle_count
+        self.blits[i] = blit_stats.sprites
+        self.index = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def _recent(self, array):
+        # Buffer contents in chronological order
+        if self.count < self.capacity:
+            return array[:self.count]
+        return np.concatenate((array[self.index:], array[:self.index]))
+
+    def summary(self):
+        if self.count == 0:
+            return {}
+        totals = self.totals[:self.count] / 1e6
+        phases = self.phases[:self.count] / 1e6
+        states = self.states[:self.count]
+        # Frame rate comes from wall-clock spacing, including time spent idle
+        starts = self.starts[:self.count]
+        span = int(starts.max() - starts.min())
+        result = {
+            'frames': int(self.count),
+            'fps': float((self.count - 1) * 1e9 / span) if span else 0.0,
+            'frame_ms': {
+                'mean': float(totals.mean()),
+                'p50': float(np.percentile(totals, 50)),
+                'p99': float(np.percentile(totals, 99)),
+                'max': float(totals.max())
+            },
+            'phase_ms': {name: float(phases[:, i].mean()) for i, name in enumerate(PHASES)},
+            'states': {}
+        }
+        for state in np.unique(states).tolist():
+            mask = states == state
+            result['states'][state] = {
+                'frames': int(mask.sum()),
+                'frame_ms': float(totals[mask].mean()),
+                'phase_ms': {name: float(phases[mask, i].mean()) for i, name in enumerate(PHASES)}
+            }
+        return result
+
+    def dump(self, path_prefix):
+        # Writes the raw frames as CSV and the summary as JSON
+        header = 'state,particles,blits,total_ns,' + ','.join(f"{name}_ns" for name in PHASES)
+        rows = np.column_stack((self._recent(self.states), self._recent(self.particles),
+                                self._recent(self.blits), self._recent(self.totals),
+                                self._recent(self.phases)))
+        np.savetxt(f"{path_prefix}.csv", rows, fmt='%d', delimiter=',', header=header, comments='')
+        with open(f"{path_prefix}.json", 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+        return path_prefix
+
+    def draw_overlay(self, screen, text, frame):
+        # `text` is the TextCache: in pipelined mode the simulation thread
+        # renders text at the same time, and only the cache serializes SDL_ttf
+        if not self.enabled or self.count == 0:
+            return
+        if frame % OVERLAY_REFRESH == 0 or self.overlay is None:
+            self.overlay = self._render_overlay(text)
+        screen.blit(self.overlay, (20, 80))
+
+    def _render_overlay(self, text):
+        last = (self.index - 1) % self.capacity
+        stats = self.summary()
+        texts = [
+            f"FPS {stats['fps']:.0f}",
+            f"frame p50 {stats['frame_ms']['p50']:.2f} ms  p99 {stats['frame_ms']['p99']:.2f} ms",
+            "  ".join(f"{name} {ms:.2f}" for name, ms in stats['phase_ms'].items()),
+            f"particles {self.particles[last]}  batched blits {self.blits[last]}"
+        ]
+        lines = [text.render('small', line, True, NEON_GREEN) for line in texts]
+
+        height = sum(line.get_height() for line in lines) + 10
+        width = max(line.get_width() for line in lines) + 20
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        y = 5
+        for line in lines:
+            panel.blit(line, (10, y))
+            y += line.get_height()
+        return panel
@@ -0,0 +1,51 @@
+import numpy as np
+from settings import *
+
+# Adaptive quality governor. The main loop reports how long each frame's
+# work took (not counting the wait for the next tick); every full window of
+# frames the average decides whether to step to a cheaper or a better tier
+# of QUALITY_TIERS. The window restarts after every change, so a new tier
+# is judged on its own frames.
+class QualityGovernor:
+    def __init__(self, tiers=QUALITY_TIERS, window=QUALITY_WINDOW):
+        self.tiers = tiers
+        self.level = 0
+        self.samples = np.zeros(window)
+        self.count = 0
+        self.good_windows = 0
+        self.upgrade_windows = QUALITY_UPGRADE_WINDOWS
+        self.upgraded = False
+
+    @property
+    def tier(self):
+        return self.tiers[self.level]
+
+    def record(self, frame_ms):
+        # Returns True when the tier changed
+        self.samples[self.count] = frame_ms
+        self.count += 1
+        if self.count < len(self.samples):
+            return False
+        self.count = 0
+        average = self.samples.mean()
+
+        if average > QUALITY_DOWNGRADE_MS and self.level < len(self.tiers) - 1:
+            if self.upgraded:
+                # The better tier did not fit after all; wait longer next time
+                self.upgrade_windows = min(self.upgrade_windows * 2, QUALITY_MAX_UPGRADE_WINDOWS)
+            self.level += 1
+            self.good_windows = 0
+            self.upgraded = False
+            return True
+
+        self.upgraded = False
+        if average < QUALITY_UPGRADE_MS and self.level > 0:
+            self.good_windows += 1
+            if self.good_windows >= self.upgrade_windows:
+                self.level -= 1
+                self.good_windows = 0
+                self.upgraded = True
+                return True
+        else:
+            self.good_windows = 0
+        return False
@@ -0,0 +1,165 @@
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+import pygame
+
+# Compact binary input logs for gameplay sessions.
+#
+# File layout: a fixed header (magic, version, session seed, frame count,
+# campaign level, SHA-256 of the final game_data) followed by a
+# zlib-compressed frame stream.
+# Each simulation frame is one byte: bits 0-3 are the held directions
+# (left, right, up, down); bit 7 means an event list follows as a count byte
+# plus one code byte per ability keypress, in the order they were handled.
+
+MAGIC = b'CFRP'
+VERSION = 4
+HEADER = struct.Struct('<4sBQIB32s')
+# Version 3 files predate the campaign; they are all level 1 sessions
+HEADER_V3 = struct.Struct('<4sBQI32s')
+
+DIRECTIONS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN)
+ALT_DIRECTIONS = (pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s)
+HAS_EVENTS = 0x80
+
+EVENT_CODES = {pygame.K_q: 1, pygame.K_e: 2}
+EVENT_KEYS = {code: key for key, code in EVENT_CODES.items()}
+
+# Held-key tuples for every direction mask, so decoding allocates nothing
+HELD_BY_MASK = [tuple(key for bit, key in enumerate(DIRECTIONS) if mask & (1 << bit))
+                for mask in range(16)]
+
+def game_data_checksum(game_data):
+    return hashlib.sha256(json.dumps(game_data, sort_keys=True).encode()).digest()
+
+class Replay:
+    def __init__(self, seed, frame_count, stream, checksum, level=1):
+        self.seed = seed
+        self.frame_count = frame_count
+        self.stream = stream
+        self.checksum = checksum
+        self.level = level
+
+    def frames(self):
+        # Yields (held keys, ability keys) for every recorded frame
+        stream = self.stream
+        i = 0
+        while i < len(stream):
+            byte = stream[i]
+            i += 1
+            events = ()
+            if byte & HAS_EVENTS:
+                count = stream[i]
+                events = tuple(EVENT_KEYS[code] for code in stream[i + 1:i + 1 + count])
+                i += 1 + count
+            yield HELD_BY_MASK[byte & 0x0F], events
+
+def write_replay(path, replay):
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, replay.seed, replay.frame_count, replay.level, replay.checksum))
+        f.write(zlib.compress(bytes(replay.stream), 9))
+
+def read_replay(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version = data[:4], data[4] if len(data) > 4 else None
+    if magic != MAGIC or version not in (3, VERSION):
+        raise ValueError(f"{path} is not a CodeFlow replay (version {VERSION})")
+    if version == 3:
+        _, _, seed, frame_count, checksum = HEADER_V3.unpack_from(data)
+        return Replay(seed, frame_count, zlib.decompress(data[HEADER_V3.size:]), checksum)
+    _, _, seed, frame_count, level, checksum = HEADER.unpack_from(data)
+    return Replay(seed, frame_count, zlib.decompress(data[HEADER.size:]), checksum, level)
+
+# Records the gameplay session driven by GameplayState, one file per session.
+# With a BackgroundTasks the file is written off the main loop.
+class ReplayRecorder:
+    def __init__(self, directory, tasks=None):
+        self.directory = directory
+        self.tasks = tasks
+        self.active = False
+        self.last_path = None
+
+    def begin(self, seed, level=1):
+        self.seed = seed
+        self.level = level
+        self.stream = bytearray()
+        self.frame_count = 0
+        self.events = []
+        self.active = True
+
+    def record_event(self, key):
+        code = EVENT_CODES.get(key)
+        if self.active and code is not None:
+            self.events.append(code)
+
+    def record_frame(self, keys):
+        if not self.active:
+            return
+        mask = 0
+        for bit in range(4):
+            if keys[DIRECTIONS[bit]] or keys[ALT_DIRECTIONS[bit]]:
+                mask |= 1 << bit
+        if self.events:
+            self.stream.append(mask | HAS_EVENTS)
+            self.stream.append(len(self.events))
+            self.stream.extend(self.events)
+            self.events.clear()
+        else:
+            self.stream.append(mask)
+        self.frame_count += 1
+
+    def finish(self, game_data):
+        if not self.active:
+            return
+        self.active = False
+        os.makedirs(self.directory, exist_ok=True)
+        self.last_path = os.path.join(self.directory, f"session-{self.seed}.cfr")
+        replay = Replay(self.seed, self.frame_count, self.stream, game_data_checksum(game_data), self.level)
+        if self.tasks is not None:
+            self.tasks.run(write_replay, self.last_path, replay)
+        else:
+            write_replay(self.last_path, replay)
+
+def replay_session(replay, runner=None):
+    # Re-simulate a replay headlessly; returns the final game_data
+    if runner is None:
+        from headless import HeadlessRunner
+        runner = HeadlessRunner()
+    controls = runner.input
+    runner.input.reset()
+    runner.start(replay.seed, replay.level)
+    for held, events in replay.frames():
+        controls.set_held(held)
+        for key in events:
+            controls.tap(key)
+        if not runner.step():
+            break
+    return runner.manager.game_data
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify recorded sessions by re-simulating them headlessly")
+    parser.add_argument('replays', nargs='+')
+    args = parser.parse_args()
+
+    from headless import HeadlessRunner
+    runner = HeadlessRunner()
+    failed = 0
+    for path in args.replays:
+        replay = read_replay(path)
+        start = time.perf_counter()
+        game_data = replay_session(replay, runner)
+        elapsed = time.perf_counter() - start
+        ok = game_data_checksum(game_data) == replay.checksum
+        failed += not ok
+        print(f"{'OK' if ok else 'MISMATCH':8} {path}: level {replay.level}, {replay.frame_count} frames in "
+              f"{elapsed:.3f}s, {game_data}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import random
+import numpy as np
+
+# Seeded random streams. Gameplay randomness (bug movement) and cosmetic
+# randomness (glitch effects, particles) draw from separate streams,
+# so purely visual changes never alter the outcome of a recorded session.
+# Each gameplay session gets its own seed, drawn from a master stream unless
+# one is queued with `next_seed` (used by replays and batch runs).
+class RandomStreams:
+    def __init__(self, seed=None):
+        self.master = random.Random(seed)
+        self.gameplay = random.Random()
+        self.cosmetic = random.Random()
+        self.particles = np.random.default_rng()
+        # NumPy streams for batched per-entity draws (see entities.py)
+        self.gameplay_batch = np.random.default_rng()
+        self.cosmetic_batch = np.random.default_rng()
+        self.seed = None
+        self.next_seed = None
+        self.reseed(self.master.getrandbits(63))
+
+    def reseed(self, seed):
+        # Reseed in place so objects holding a stream keep a valid reference
+        self.seed = seed
+        gameplay, cosmetic, particles, gameplay_batch, cosmetic_batch = np.random.SeedSequence(seed).spawn(5)
+        self.gameplay.seed(int(gameplay.generate_state(1, np.uint64)[0]))
+        self.cosmetic.seed(int(cosmetic.generate_state(1, np.uint64)[0]))
+        self.particles.bit_generator.state = np.random.PCG64(particles).state
+        self.gameplay_batch.bit_generator.state = np.random.PCG64(gameplay_batch).state
+        self.cosmetic_batch.bit_generator.state = np.random.PCG64(cosmetic_batch).state
+
+    def reserve_session(self):
+        # Fix the next session's seed early, e.g. to generate its level ahead
+        if self.next_seed is None:
+            self.next_seed = self.master.getrandbits(63)
+        return self.next_seed
+
+    def begin_session(self):
+        seed = self.next_seed
+        self.next_seed = None
+        if seed is None:
+            seed = self.master.getrandbits(63)
+        self.reseed(seed)
+        return seed
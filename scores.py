@@ -0,0 +1,219 @@
+import argparse
+import contextlib
+import os
+import queue
+import socket
+import sqlite3
+import threading
+import time
+from settings import *
+
+# Finished sessions and leaderboards, kept in a local SQLite database in WAL
+# mode. States only queue results (add() never touches the disk); a writer
+# thread opens the database and commits queued sessions in batches. Reads
+# use their own connection per thread, which WAL lets run alongside the
+# writer, so leaderboard queries go through manager.tasks.
+#
+# Each kiosk stamps its sessions with its name and a nanosecond timestamp,
+# which together identify a session across databases: merging another
+# kiosk's database any number of times adds each session once.
+#
+#   python scores.py DB [--top N] [--profile P]     show the leaderboard
+#   python scores.py DB --merge OTHER...            merge other databases
+
+SCHEMA_VERSION = 3
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    kiosk TEXT NOT NULL,
+    session INTEGER NOT NULL,
+    finished REAL NOT NULL,
+    seed INTEGER,
+    profile TEXT NOT NULL,
+    level INTEGER NOT NULL DEFAULT 1,
+    outcome TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    time INTEGER NOT NULL,
+    bugs_fixed INTEGER NOT NULL,
+    UNIQUE (kiosk, session)
+);
+CREATE INDEX IF NOT EXISTS sessions_score ON sessions (score DESC, finished);
+CREATE INDEX IF NOT EXISTS sessions_profile_score ON sessions (profile, score DESC, finished);
+CREATE INDEX IF NOT EXISTS sessions_level_score ON sessions (profile, level, outcome, score DESC, finished);
+'''
+# Upgrades from each older schema version
+MIGRATIONS = {
+    1: 'ALTER TABLE sessions ADD COLUMN level INTEGER NOT NULL DEFAULT 1',
+    2: 'CREATE INDEX IF NOT EXISTS sessions_level_score ON sessions (profile, level, outcome, score DESC, finished)',
+}
+COLUMNS = ('kiosk', 'session', 'finished', 'seed', 'profile', 'level', 'outcome', 'score', 'time',
+           'bugs_fixed')
+INSERT = (f"INSERT OR IGNORE INTO sessions ({', '.join(COLUMNS)}) "
+          f"VALUES ({', '.join('?' * len(COLUMNS))})")
+
+# Session outcome by the state gameplay ended in
+OUTCOMES = {LEVEL_COMPLETE: 'complete', GAME_OVER: 'crashed'}
+
+def connect(path):
+    connection = sqlite3.connect(path, timeout=SCORE_BUSY_SECONDS, isolation_level=None)
+    connection.execute('PRAGMA journal_mode=WAL')
+    # In WAL mode NORMAL only risks the latest commits on power loss, never corruption
+    connection.execute('PRAGMA synchronous=NORMAL')
+    version = connection.execute('PRAGMA user_version').fetchone()[0]
+    if version < SCHEMA_VERSION:
+        with transaction(connection):
+            if version == 0:
+                for statement in SCHEMA.split(';'):
+                    connection.execute(statement)
+            else:
+                for step in range(version, SCHEMA_VERSION):
+                    connection.execute(MIGRATIONS[step])
+            connection.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+    return connection
+
+class ScoreStore:
+    def __init__(self, path, kiosk=SCORE_KIOSK):
+        self.path = path
+        self.kiosk = kiosk or socket.gethostname()
+        self.queue = queue.SimpleQueue()
+        self.readers = threading.local()
+        # Set once the writer has created the database
+        self.ready = threading.Event()
+        self.written = 0
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name='scores', daemon=True)
+        self.thread.start()
+
+    def add(self, seed, profile, level, state, game_data):
+        # Any thread; queues the session and returns immediately
+        self.queue.put((self.kiosk, time.time_ns(), time.time(), seed, profile, level, OUTCOMES[state],
+                        game_data['score'], game_data['time'], game_data['bugs_fixed']))
+
+    def close(self):
+        # Commits everything queued so far
+        self.queue.put(None)
+        self.thread.join()
+
+    def _run(self):
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = connect(self.path)
+        except (OSError, sqlite3.Error) as error:
+            self.error = error
+            self.ready.set()
+            return
+        self.ready.set()
+        running = True
+        while running:
+            batch = []
+            # Wait for a session, then collect more for up to SCORE_FLUSH_SECONDS
+            record = self.queue.get()
+            deadline = time.perf_counter() + SCORE_FLUSH_SECONDS
+            while record is not None:
+                batch.append(record)
+                if len(batch) >= SCORE_BATCH:
+                    break
+                try:
+                    record = self.queue.get(timeout=max(0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+            running = record is not None
+            if batch:
+                self._commit(connection, batch)
+        connection.close()
+
+    def _commit(self, connection, batch):
+        try:
+            with transaction(connection):
+                connection.executemany(INSERT, batch)
+            self.written += len(batch)
+        except sqlite3.Error as error:
+            self.error = error
+
+    def _reader(self):
+        connection = getattr(self.readers, 'connection', None)
+        if connection is None:
+            self.ready.wait()
+            connection = sqlite3.connect(self.path, timeout=SCORE_BUSY_SECONDS)
+            self.readers.connection = connection
+        return connection
+
+    # Leaderboard queries; each is answered from an index, whatever the
+    # number of stored sessions. Run them off the main loop (manager.tasks).
+    def top(self, limit=10, profile=None, level=None, outcome=None):
+        return leaderboard(self._reader(), limit, profile, level, outcome)
+
+    def best(self, profile=None, level=None, state=None):
+        # Sessions that ended in `state` score by different rules, so the
+        # best score is only looked up among sessions with the same ending
+        rows = self.top(1, profile, level, OUTCOMES[state] if state is not None else None)
+        return rows[0]['score'] if rows else None
+
+    def rank(self, score, profile=None):
+        # 1 + the number of sessions that scored higher
+        if profile is None:
+            query, args = 'SELECT COUNT(*) FROM sessions WHERE score > ?', (score,)
+        else:
+            query, args = 'SELECT COUNT(*) FROM sessions WHERE profile = ? AND score > ?', (profile, score)
+        return self._reader().execute(query, args).fetchone()[0] + 1
+
+@contextlib.contextmanager
+def transaction(connection):
+    connection.execute('BEGIN IMMEDIATE')
+    try:
+        yield
+    except BaseException:
+        connection.execute('ROLLBACK')
+        raise
+    connection.execute('COMMIT')
+
+def leaderboard(connection, limit=10, profile=None, level=None, outcome=None):
+    # Filters are given in index order, so every combination the game asks
+    # for is answered from sessions_score or one of the profile indexes
+    filters = [(name, value) for name, value in (('profile', profile), ('level', level), ('outcome', outcome))
+               if value is not None]
+    where = f"WHERE {' AND '.join(f'{name} = ?' for name, _ in filters)} " if filters else ''
+    query = f"SELECT {', '.join(COLUMNS)} FROM sessions {where}ORDER BY score DESC, finished LIMIT ?"
+    args = [value for _, value in filters] + [limit]
+    return [dict(zip(COLUMNS, row)) for row in connection.execute(query, args)]
+
+def merge(connection, path):
+    # Adds the sessions of another database; returns how many were new.
+    # The other database is brought up to the current schema first.
+    connect(path).close()
+    connection.execute('ATTACH DATABASE ? AS other', (path,))
+    try:
+        before = connection.total_changes
+        with transaction(connection):
+            columns = ', '.join(COLUMNS)
+            connection.execute(f'INSERT OR IGNORE INTO sessions ({columns}) '
+                               f'SELECT {columns} FROM other.sessions')
+        return connection.total_changes - before
+    finally:
+        connection.execute('DETACH DATABASE other')
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the leaderboard or merge kiosk score databases")
+    parser.add_argument('database')
+    parser.add_argument('--merge', nargs='+', metavar='OTHER', default=[])
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--profile', help="Only sessions played on this level profile")
+    parser.add_argument('--level', type=int, help="Only sessions of this campaign level")
+    parser.add_argument('--outcome', choices=sorted(OUTCOMES.values()), help="Only sessions with this ending")
+    args = parser.parse_args()
+
+    connection = connect(args.database)
+    for path in args.merge:
+        print(f"{path}: {merge(connection, path)} new sessions")
+    if args.merge:
+        connection.execute('PRAGMA optimize')
+    for place, row in enumerate(leaderboard(connection, args.top, args.profile, args.level, args.outcome), 1):
+        finished = time.strftime('%Y-%m-%d %H:%M', time.localtime(row['finished']))
+        print(f"{place:>3}. {row['score']:>7}  level {row['level']:<3} {row['outcome']:<9} {row['bugs_fixed']:>4} bugs "
+              f"{row['time']:>5}s  {row['profile']:<8} {row['kiosk']}  {finished}")
+    connection.close()
+
+if __name__ == "__main__":
+    main()
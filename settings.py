@@ -27,8 +27,125 @@ PLAYER_HEIGHT = 80
 PLAYER_SPEED = 8  # Increased speed for better movement
 PLAYER_MAX_HEALTH = 100
 PLAYER_MAX_ENERGY = 100
+PLAYER_START = (100, HEIGHT - 150)  # Bugs keep the level profile's clearance from it
 
 # Game object settings
 DATA_BYTE_SIZE = 15
+DATA_BYTE_ENERGY = 10
 BUG_WIDTH = 40
 BUG_HEIGHT = 40
+
+# Q-ability settings
+Q_SCAN_RANGE = 400
+Q_FIX_ENERGY_COST = 20
+
+# Spatial index cell size in pixels
+SPATIAL_CELL_SIZE = 128
+
+# Level size; larger than the screen makes the camera scroll. Entity counts
+# in the level profile are per screen-sized sector of the world.
+WORLD_WIDTH = WIDTH
+WORLD_HEIGHT = HEIGHT
+
+# Procedural level difficulty profiles (see level_gen.py)
+LEVEL_PROFILES = {
+    'easy': {'bytes_per_sector': 20, 'bugs_per_sector': 4, 'min_spacing': 60, 'spawn_clearance': 300},
+    'normal': {'bytes_per_sector': 15, 'bugs_per_sector': 5, 'min_spacing': 60, 'spawn_clearance': 250},
+    'hard': {'bytes_per_sector': 10, 'bugs_per_sector': 8, 'min_spacing': 50, 'spawn_clearance': 180}
+}
+LEVEL_PROFILE = 'normal'
+
+# Campaign: levels per run, and the bugs per sector each level past the
+# first adds to the profile's. The next level is built into the gameplay
+# state while the completion screen shows, LEVEL_STAGE_CHUNK entities at a
+# time within LEVEL_STAGE_BUDGET_MS per frame.
+CAMPAIGN_LEVELS = 5
+CAMPAIGN_EXTRA_BUGS = 1
+LEVEL_STAGE_CHUNK = 64
+LEVEL_STAGE_BUDGET_MS = 2
+
+# Loading screen: worker threads, and main-thread time per frame for loading
+LOADER_WORKERS = 4
+LOADER_FRAME_BUDGET_MS = 4
+
+# Generated levels are cached here, keyed by seed and level parameters
+LEVEL_CACHE_DIR = '.level_cache'
+LEVEL_CACHE_FILES = 64
+
+# Entities further than this outside the viewport are frozen (not updated)
+SIM_MARGIN = 256
+
+# Particle budgets: live particles across all screens, and per screen.
+# Bursts past a budget replace the particles closest to fading out.
+PARTICLE_BUDGET = 3000
+PARTICLE_STATE_BUDGETS = {
+    SPLASH: 300,
+    MENU: 300,
+    LOADING: 300,
+    GAMEPLAY: 2000,
+    LEVEL_COMPLETE: 600,
+    GAME_OVER: 300
+}
+
+# Adaptive quality (main.py --fixed-quality turns it off). Tiers run from
+# best to cheapest: particle_rate scales particle spawns, particle_alpha
+# picks fading or opaque particles, glow covers the player glow and the
+# scan-range circle, and render_scale draws the gameplay scene at that
+# fraction of the window size and scales it up (the HUD stays sharp). The
+# upscale only pays off where pixel fill is the bottleneck; check with
+# benchmarks/run.py --only gameplay.draw before lowering it in a tier.
+# The tier steps down when the average frame time over QUALITY_WINDOW
+# frames is above QUALITY_DOWNGRADE_MS, and back up after
+# QUALITY_UPGRADE_WINDOWS windows below QUALITY_UPGRADE_MS (doubled, up to
+# QUALITY_MAX_UPGRADE_WINDOWS, each time an upgrade has to be undone).
+ADAPTIVE_QUALITY = True
+QUALITY_TIERS = [
+    {'name': 'high', 'particle_rate': 1.0, 'particle_alpha': True, 'glow': True, 'render_scale': 1.0},
+    {'name': 'medium', 'particle_rate': 0.6, 'particle_alpha': True, 'glow': True, 'render_scale': 1.0},
+    {'name': 'low', 'particle_rate': 0.4, 'particle_alpha': False, 'glow': False, 'render_scale': 1.0},
+    {'name': 'minimal', 'particle_rate': 0.2, 'particle_alpha': False, 'glow': False, 'render_scale': 1.0}
+]
+QUALITY_WINDOW = 60
+QUALITY_DOWNGRADE_MS = 15.0
+QUALITY_UPGRADE_MS = 10.0
+QUALITY_UPGRADE_WINDOWS = 3
+QUALITY_MAX_UPGRADE_WINDOWS = 48
+
+# Session telemetry (also: main.py --telemetry DIR; None turns it off).
+# Ring buffer sizes in records, writer interval, and file rotation limits.
+TELEMETRY_DIR = None
+TELEMETRY_FRAMES = 4096
+TELEMETRY_EVENTS = 1024
+TELEMETRY_FLUSH_SECONDS = 2.0
+TELEMETRY_FILE_BYTES = 1 << 20
+TELEMETRY_FILES = 20
+
+# Finished sessions are stored here (also: main.py --scores PATH; None turns
+# it off). Queued sessions are committed in batches of up to SCORE_BATCH, at
+# most SCORE_FLUSH_SECONDS after the first one. SCORE_KIOSK names this
+# machine in merged databases (None: the host name).
+SCORE_DB = 'scores.db'
+SCORE_BATCH = 64
+SCORE_FLUSH_SECONDS = 1.0
+SCORE_BUSY_SECONDS = 5.0
+SCORE_KIOSK = None
+
+# Main loop on asyncio (also: main.py --asyncio); worker threads for the
+# states' blocking background tasks, and how long unfinished tasks get at exit
+ASYNC_LOOP = False
+TASK_WORKERS = 2
+TASK_SHUTDOWN_SECONDS = 2.0
+
+# Run the simulation on its own thread and draw interpolated snapshots
+# (also: main.py --pipelined)
+PIPELINED = False
+
+# Fixed-timestep simulation: cap on catch-up updates per rendered frame
+MAX_UPDATES_PER_FRAME = 5
+
+# Frame profiler (F3 toggles the overlay, F4 dumps CSV/JSON)
+PROFILER_FRAMES = 600
+
+# Dirty-rectangle rendering for static screens (also: main.py --dirty-rects)
+DIRTY_RECTS = False
+DIRTY_TILE_SIZE = 32
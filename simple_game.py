@@ -2,27 +2,18 @@ import pygame
 import sys
 import random
 import math
+import time
+from main import bootstrap
+from settings import *
 
-# Initialize pygame
-pygame.init()
-
-# Screen dimensions
-WIDTH, HEIGHT = 1280, 720
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("CodeFlow: The Debugging Odyssey")
-
-# Colors
-DARK_BLUE = (10, 15, 30)
-NEON_BLUE = (0, 195, 255)
-NEON_PURPLE = (180, 0, 255)
-NEON_GREEN = (0, 255, 140)
-RED = (255, 50, 50)
-WHITE = (255, 255, 255)
+# Initialize pygame and create screen (same startup path as main.py)
+screen, fonts = bootstrap()
 
 # Font
-font_large = pygame.font.Font(None, 72)
-font_medium = pygame.font.Font(None, 48)
-font_small = pygame.font.Font(None, 32)
+fonts = fonts.result()
+font_large = fonts['large']
+font_medium = fonts['medium']
+font_small = fonts['small']
 
 # Game state
 current_state = "SPLASH"
@@ -30,9 +21,11 @@ pulse_value = 0
 pulse_direction = 1
 title_glitch = 0
 
+# The splash prompt is rendered once and faded with set_alpha()
+prompt_text = font_small.render("PRESS ANY KEY TO BEGIN", True, WHITE)
+
 # Clock
 clock = pygame.time.Clock()
-FPS = 60
 
 # Main game loop
 running = True
@@ -67,7 +60,6 @@ while running:
         screen.blit(subtitle_text, (WIDTH/2 - subtitle_text.get_width()/2, HEIGHT/3 + title_text.get_height() + 10))
         
         # Draw prompt
-        prompt_text = font_small.render("PRESS ANY KEY TO BEGIN", True, WHITE)
         prompt_alpha = int(255 * (0.5 + pulse_value/2))
         prompt_text.set_alpha(prompt_alpha)
         screen.blit(prompt_text, (WIDTH/2 - prompt_text.get_width()/2, HEIGHT * 2/3))
@@ -81,7 +73,7 @@ while running:
             option_rect = option_text.get_rect(center=(WIDTH/2, y_pos))
             
             # Highlight effect
-            highlight = math.sin(pygame.time.get_ticks() * 0.003 + i) * 0.5 + 0.5
+            highlight = math.sin(time.perf_counter() * 3 + i) * 0.5 + 0.5
             pygame.draw.rect(screen, (
                 int(NEON_BLUE[0] * highlight),
                 int(NEON_BLUE[1] * highlight),
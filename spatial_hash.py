@@ -0,0 +1,97 @@
+# Uniform-grid spatial index. Entities are registered with a reference point
+# and bucketed into square cells of `cell_size` pixels; moving an entity only
+# touches the grid when it crosses into another cell. Queries visit just the
+# cells overlapping the search area and compare squared distances.
+class SpatialHash:
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, obj):
+        return obj in self.entries
+
+    def _cell(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+
+    def insert(self, obj, x, y):
+        cell = self._cell(x, y)
+        self.entries[obj] = [x, y, cell]
+        # Dicts keep insertion order, so query results are deterministic
+        self.cells.setdefault(cell, {})[obj] = None
+
+    def remove(self, obj):
+        entry = self.entries.pop(obj, None)
+        if entry is None:
+            return
+        bucket = self.cells[entry[2]]
+        del bucket[obj]
+        if not bucket:
+            del self.cells[entry[2]]
+
+    def move(self, obj, x, y):
+        entry = self.entries[obj]
+        if entry[0] == x and entry[1] == y:
+            return
+        entry[0] = x
+        entry[1] = y
+        cell = self._cell(x, y)
+        if cell == entry[2]:
+            return
+
+        bucket = self.cells[entry[2]]
+        del bucket[obj]
+        if not bucket:
+            del self.cells[entry[2]]
+        entry[2] = cell
+        self.cells.setdefault(cell, {})[obj] = None
+
+    def _cells_in(self, left, top, right, bottom):
+        min_cx, min_cy = self._cell(left, top)
+        max_cx, max_cy = self._cell(right, bottom)
+        cells = self.cells
+        # Sparse grids: walking the occupied cells is cheaper than the range
+        if (max_cx - min_cx + 1) * (max_cy - min_cy + 1) > len(cells):
+            for (cx, cy), bucket in cells.items():
+                if min_cx <= cx <= max_cx and min_cy <= cy <= max_cy:
+                    yield bucket
+            return
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    yield bucket
+
+    def query_circle(self, x, y, radius):
+        # Entities whose reference point lies strictly inside the circle
+        radius_sq = radius * radius
+        entries = self.entries
+        found = []
+        for bucket in self._cells_in(x - radius, y - radius, x + radius, y + radius):
+            for obj in bucket:
+                entry = entries[obj]
+                dx = entry[0] - x
+                dy = entry[1] - y
+                if dx * dx + dy * dy < radius_sq:
+                    found.append(obj)
+        return found
+
+    def query_rect(self, left, top, width, height):
+        # Entities whose reference point lies inside the axis-aligned box
+        right = left + width
+        bottom = top + height
+        entries = self.entries
+        found = []
+        for bucket in self._cells_in(left, top, right, bottom):
+            for obj in bucket:
+                entry = entries[obj]
+                if left <= entry[0] < right and top <= entry[1] < bottom:
+                    found.append(obj)
+        return found
@@ -0,0 +1,84 @@
+from collections import OrderedDict
+import pygame
+
+# Alpha is quantized into steps of this size so fading particles share sprites
+ALPHA_STEP = 16
+
+def render_circle(color, size, alpha_level):
+    # Safe to call from worker threads; only touches the new surface.
+    # An alpha level of None gives an opaque, colorkeyed sprite, which is
+    # much cheaper to blit than a per-pixel alpha one.
+    if alpha_level is None:
+        sprite = pygame.Surface((size * 2, size * 2))
+        sprite.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        pygame.draw.circle(sprite, color, (size, size), size)
+        return sprite
+    alpha = min(255, alpha_level * ALPHA_STEP)
+    sprite = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, (color[0], color[1], color[2], alpha), (size, size), size)
+    return sprite
+
+# Pre-rendered circle sprites keyed by (color, size, quantized alpha).
+# Sprites are rendered lazily on first use and the least recently used
+# ones are evicted once the cache holds `max_entries` surfaces.
+class SpriteCache:
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def circle(self, color, size, alpha_level):
+        key = (color, size, alpha_level)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+            return sprite
+
+        self.misses += 1
+        sprite = render_circle(color, size, alpha_level)
+        self.add(key, sprite)
+        return sprite
+
+    def add(self, key, sprite):
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.max_entries:
+            self.sprites.popitem(last=False)
+
+    def warm(self, colors, sizes):
+        # Build every alpha level for the given colors and sizes up front
+        for key in circle_keys(colors, sizes):
+            self.circle(*key)
+
+    def clear(self):
+        self.sprites.clear()
+
+def circle_keys(colors, sizes):
+    return [(tuple(color), size, alpha_level) for color in colors for size in sizes
+            for alpha_level in range(255 // ALPHA_STEP + 1)]
+
+# Running totals of batched draw calls, read and reset by the frame profiler
+class BlitStats:
+    def __init__(self):
+        self.batches = 0
+        self.sprites = 0
+
+    def reset(self):
+        self.batches = 0
+        self.sprites = 0
+
+blit_stats = BlitStats()
+
+def blit_batch(screen, sequence):
+    blit_stats.batches += 1
+    blit_stats.sprites += len(sequence)
+    # pygame-ce offers the faster fblits(); fall back to blits() otherwise
+    fblits = getattr(screen, 'fblits', None)
+    if fblits is not None:
+        fblits(sequence)
+    else:
+        screen.blits(sequence, False)
@@ -0,0 +1,94 @@
+import asyncio
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from settings import *
+
+# Background work for the game states, available as manager.tasks.
+# Coroutines run cooperatively on the main loop's asyncio event loop
+# (main.py --asyncio) and blocking calls on a small thread pool, so saving
+# files or talking to a database overlaps with rendering. The classic loop
+# drives the same event loop with poll() once per frame.
+#
+#   manager.tasks.spawn(coroutine, done)       run a coroutine
+#   manager.tasks.run(function, *args, done)   run a blocking call on a worker
+#
+# `done(result)` is called on the main thread once the work has finished,
+# or handed to `dispatch(done, result)` when set: the pipelined simulation
+# thread uses it to run callbacks on its own thread, next to the state they
+# touch. Both calls are safe from the simulation thread.
+class BackgroundTasks:
+    def __init__(self, workers=TASK_WORKERS):
+        self.workers = workers
+        self.loop = None
+        self.owns_loop = False
+        # The thread the event loop runs on
+        self.thread = threading.get_ident()
+        self.executor = None
+        self.pending = set()
+        self.failed = 0
+        self.dispatch = None
+
+    def attach(self, loop):
+        # Run on an event loop driven elsewhere (the asyncio main loop)
+        self.loop = loop
+        self.owns_loop = False
+        self.thread = threading.get_ident()
+
+    def _ensure_loop(self):
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+            self.owns_loop = True
+        return self.loop
+
+    def spawn(self, coroutine, done=None):
+        loop = self._ensure_loop()
+        if threading.get_ident() == self.thread:
+            self._track(loop.create_task(coroutine), done)
+        else:
+            loop.call_soon_threadsafe(lambda: self._track(loop.create_task(coroutine), done))
+
+    def run(self, function, *args, done=None):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='task')
+        async def call():
+            return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+        self.spawn(call(), done)
+
+    def _track(self, task, done):
+        self.pending.add(task)
+        task.add_done_callback(lambda task: self._finished(task, done))
+
+    def _finished(self, task, done):
+        self.pending.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self.failed += 1
+            print(f"Background task failed: {error!r}", file=sys.stderr)
+        elif done is not None:
+            if self.dispatch is not None:
+                self.dispatch(done, task.result())
+            else:
+                done(task.result())
+
+    def poll(self):
+        # Classic loop: run whatever is ready without blocking
+        if self.owns_loop:
+            self.loop.call_soon(self.loop.stop)
+            self.loop.run_forever()
+
+    async def drain(self, timeout=TASK_SHUTDOWN_SECONDS):
+        # Give unfinished work a moment to complete, then cancel it
+        if self.pending:
+            _, unfinished = await asyncio.wait(set(self.pending), timeout=timeout)
+            for task in unfinished:
+                task.cancel()
+
+    def close(self):
+        if self.owns_loop:
+            self.loop.run_until_complete(self.drain())
+            self.loop.close()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
@@ -0,0 +1,261 @@
+import argparse
+import os
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+from settings import *
+
+# Session telemetry, cheap enough to leave on in production: per-frame
+# timings and counts plus gameplay events (state changes, abilities) go
+# into preallocated ring buffers, and a background thread writes them out
+# as compressed chunks to a rotating set of files. Recording a frame or an
+# event only stores a few numbers into existing arrays; all copying,
+# compression and I/O happen on the writer thread.
+#
+# File layout: a header (magic, version, wall-clock start, perf counter
+# base in ns) followed by chunks. A chunk header holds the record kind, the
+# record count, how many records were lost to ring overruns just before
+# it, and the compressed size; the payload is the zlib-compressed records.
+#
+#   python telemetry.py FILE|DIR...     summarize recorded files
+
+MAGIC = b'CFTM'
+VERSION = 2
+HEADER = struct.Struct('<4sBdq')
+CHUNK = struct.Struct('<BIII')
+
+FRAMES, EVENTS = range(2)
+# Frame work is int64: a stalled frame (window drag, suspend, level build)
+# can take longer than the 2.1 s an int32 of nanoseconds holds
+FRAME_DTYPE = np.dtype([('time_ns', '<i8'), ('work_ns', '<i8'), ('state', 'i1'), ('quality', 'i1'),
+                        ('particles', '<i4'), ('entities', '<i4')])
+EVENT_DTYPE = np.dtype([('time_ns', '<i8'), ('frame', '<u4'), ('kind', 'u1'), ('a', '<i4'), ('b', '<i4')])
+DTYPES = (FRAME_DTYPE, EVENT_DTYPE)
+# Version 1 files stored frame work as int32
+FRAME_DTYPE_V1 = np.dtype([('time_ns', '<i8'), ('work_ns', '<i4'), ('state', 'i1'), ('quality', 'i1'),
+                           ('particles', '<i4'), ('entities', '<i4')])
+
+# Event kinds and their (a, b) values
+STATE_CHANGE = 1   # old state, new state
+SCAN = 2           # bugs highlighted
+FIX = 3            # bugs fixed, Q-energy spent
+EVENT_NAMES = {STATE_CHANGE: 'state change', SCAN: 'scan', FIX: 'fix'}
+STATE_NAMES = {SPLASH: 'splash', MENU: 'menu', LOADING: 'loading', GAMEPLAY: 'gameplay',
+               LEVEL_COMPLETE: 'level complete', GAME_OVER: 'game over'}
+
+# Fixed-size ring of records with a single producer. `written` only ever
+# grows; the writer thread copies out everything between its own position
+# and `written`, and counts records the producer overwrote first as lost.
+class Ring:
+    def __init__(self, dtype, capacity):
+        self.records = np.zeros(capacity, dtype=dtype)
+        self.capacity = capacity
+        self.written = 0
+        self.flushed = 0
+        # Field views, bound once so recording allocates no views
+        self.fields = [self.records[name] for name in dtype.names]
+
+    def take(self):
+        # Writer thread: records since the last take(), and how many were lost
+        end = self.written
+        start = max(self.flushed, end - self.capacity)
+        lost = start - self.flushed
+        first = start % self.capacity
+        if first + (end - start) <= self.capacity:
+            records = self.records[first:first + end - start].copy()
+        else:
+            records = np.concatenate((self.records[first:], self.records[:end % self.capacity]))
+        # Anything the producer overwrote while copying is lost as well
+        overrun = min(end - start, max(0, self.written - self.capacity - start))
+        if overrun:
+            records = records[overrun:]
+            lost += overrun
+        self.flushed = end
+        return records, lost
+
+class Telemetry:
+    def __init__(self, directory, frames=TELEMETRY_FRAMES, events=TELEMETRY_EVENTS):
+        self.directory = directory
+        self.base_ns = time.perf_counter_ns()
+        self.started = time.time()
+        self.frames = Ring(FRAME_DTYPE, frames)
+        self.events = Ring(EVENT_DTYPE, events)
+        self.frame_fields = self.frames.fields
+        self.event_fields = self.events.fields
+        self.file = None
+        self.file_index = 0
+        self.wake = threading.Event()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='telemetry', daemon=True)
+        self.thread.start()
+
+    def frame(self, work_ns, state, quality, particles, entities):
+        # Main loop, once per presented frame
+        ring = self.frames
+        i = ring.written % ring.capacity
+        time_ns, work, states, qualities, particle_counts, entity_counts = self.frame_fields
+        time_ns[i] = time.perf_counter_ns() - self.base_ns
+        work[i] = work_ns
+        states[i] = state
+        qualities[i] = quality
+        particle_counts[i] = particles
+        entity_counts[i] = entities
+        ring.written += 1
+        if ring.written - ring.flushed >= ring.capacity // 2:
+            self.wake.set()
+
+    def event(self, frame, kind, a=0, b=0):
+        # Simulation thread, for gameplay events
+        ring = self.events
+        i = ring.written % ring.capacity
+        time_ns, frames, kinds, values_a, values_b = self.event_fields
+        time_ns[i] = time.perf_counter_ns() - self.base_ns
+        frames[i] = frame
+        kinds[i] = kind
+        values_a[i] = a
+        values_b[i] = b
+        ring.written += 1
+        if ring.written - ring.flushed >= ring.capacity // 2:
+            self.wake.set()
+
+    def state_change(self, frame, old_state, new_state):
+        self.event(frame, STATE_CHANGE, old_state, new_state)
+
+    def scan(self, frame, highlighted):
+        self.event(frame, SCAN, highlighted)
+
+    def fix(self, frame, fixed, energy):
+        self.event(frame, FIX, fixed, energy)
+
+    def close(self):
+        self.running = False
+        self.wake.set()
+        self.thread.join()
+
+    def _run(self):
+        while self.running:
+            self.wake.wait(TELEMETRY_FLUSH_SECONDS)
+            self.wake.clear()
+            self.flush()
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+
+    def flush(self):
+        for kind, ring in ((FRAMES, self.frames), (EVENTS, self.events)):
+            records, lost = ring.take()
+            if len(records) or lost:
+                self._write_chunk(kind, records, lost)
+        if self.file is not None:
+            self.file.flush()
+
+    def _write_chunk(self, kind, records, lost):
+        if self.file is None or self.file.tell() >= TELEMETRY_FILE_BYTES:
+            self._rotate()
+        payload = zlib.compress(records.tobytes(), 6)
+        self.file.write(CHUNK.pack(kind, len(records), lost, len(payload)))
+        self.file.write(payload)
+
+    def _rotate(self):
+        if self.file is not None:
+            self.file.close()
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started))
+        path = os.path.join(self.directory, f"telemetry-{stamp}-{self.file_index:03d}.cft")
+        self.file_index += 1
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.started, self.base_ns))
+        self._prune()
+
+    def _prune(self):
+        # Keep only the newest TELEMETRY_FILES files
+        paths = sorted(os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                       if name.startswith('telemetry-') and name.endswith('.cft'))
+        for path in paths[:max(0, len(paths) - TELEMETRY_FILES)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+def read_telemetry(path):
+    # Returns (wall-clock start, frame records, event records, lost counts)
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, started, _ = HEADER.unpack_from(data)
+    if magic != MAGIC or version not in (1, VERSION):
+        raise ValueError(f"{path} is not a CodeFlow telemetry file (version {VERSION})")
+    dtypes = (FRAME_DTYPE_V1, EVENT_DTYPE) if version == 1 else DTYPES
+    parts = ([], [])
+    lost = [0, 0]
+    offset = HEADER.size
+    while offset + CHUNK.size <= len(data):
+        kind, count, chunk_lost, size = CHUNK.unpack_from(data, offset)
+        offset += CHUNK.size
+        if offset + size > len(data):
+            break  # Truncated by a crash mid-write
+        records = np.frombuffer(zlib.decompress(data[offset:offset + size]), dtype=dtypes[kind])
+        parts[kind].append(records.astype(DTYPES[kind]))
+        lost[kind] += chunk_lost
+        offset += size
+    frames, events = (np.concatenate(chunks) if chunks else np.zeros(0, dtype)
+                      for chunks, dtype in zip(parts, DTYPES))
+    return started, frames, events, lost
+
+def summarize(frames, events, lost):
+    lines = []
+    budget_ms = 1000 / FPS
+    if len(frames):
+        work_ms = frames['work_ns'] / 1e6
+        # Wall-clock time between frames, leaving out gaps between sessions
+        gaps = np.diff(frames['time_ns']) / 1e9
+        duration = gaps[(gaps > 0) & (gaps < 1)].sum()
+        p50, p95, p99 = np.percentile(work_ms, (50, 95, 99))
+        slow = int(np.count_nonzero(work_ms > budget_ms))
+        lines.append(f"frames      {len(frames)} over {duration:.1f}s ({lost[FRAMES]} lost)")
+        lines.append(f"frame work  p50 {p50:.2f} ms, p95 {p95:.2f} ms, p99 {p99:.2f} ms, max {work_ms.max():.2f} ms")
+        lines.append(f"over budget {slow} frames ({slow * 100 / len(frames):.1f}%) above {budget_ms:.1f} ms")
+        for state in np.unique(frames['state']).tolist():
+            in_state = work_ms[frames['state'] == state]
+            lines.append(f"  {STATE_NAMES.get(state, state):<15} {len(in_state):>7} frames, "
+                         f"p95 {np.percentile(in_state, 95):.2f} ms, max {in_state.max():.2f} ms")
+        lines.append(f"particles   max {frames['particles'].max()}, entities max {frames['entities'].max()}")
+        quality_changes = int(np.count_nonzero(np.diff(frames['quality'])))
+        lines.append(f"quality     {quality_changes} tier changes, lowest tier {frames['quality'].max()}")
+    if len(events) or lost[EVENTS]:
+        lines.append(f"events      {len(events)} ({lost[EVENTS]} lost)")
+        for kind, name in EVENT_NAMES.items():
+            chosen = events[events['kind'] == kind]
+            if len(chosen):
+                lines.append(f"  {name:<15} {len(chosen):>7} times, total {int(chosen['a'].sum())}")
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize recorded telemetry files")
+    parser.add_argument('files', nargs='+', metavar='FILE|DIR',
+                        help="Telemetry files, or directories (as given to --telemetry) to read all of")
+    args = parser.parse_args()
+
+    paths = []
+    for path in args.files:
+        if os.path.isdir(path):
+            paths.extend(os.path.join(path, name) for name in os.listdir(path)
+                         if name.startswith('telemetry-') and name.endswith('.cft'))
+        else:
+            paths.append(path)
+    if not paths:
+        parser.error("no telemetry files found")
+
+    frames, events, lost = [], [], [0, 0]
+    for path in sorted(paths):
+        started, file_frames, file_events, file_lost = read_telemetry(path)
+        print(f"{path}: session started {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started))}")
+        frames.append(file_frames)
+        events.append(file_events)
+        lost = [a + b for a, b in zip(lost, file_lost)]
+    for line in summarize(np.concatenate(frames), np.concatenate(events), lost):
+        print(line)
+
+if __name__ == "__main__":
+    main()
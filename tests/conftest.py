@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The game modules live at the repository root and star-import settings;
+# pygame must never open a window or an audio device under test
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
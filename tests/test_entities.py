@@ -0,0 +1,49 @@
+import numpy as np
+from entities import BugStore
+
+def make_store(count):
+    store = BugStore(capacity=4)
+    views = store.extend(np.column_stack((np.arange(count) * 100 + 50, np.full(count, 60))))
+    # Tag every row so moved rows can be traced back to their entity
+    store.health[:count] = np.arange(count)
+    return store, views
+
+def assert_consistent(store):
+    assert len(store.views) == store.count
+    for row, view in enumerate(store.views):
+        assert view.index == row
+        assert view.store is store
+
+def test_remove_rows_keeps_views_pointing_at_their_entities():
+    store, views = make_store(10)
+    tags = {view: int(store.health[view.index]) for view in views}
+    removed = [views[i] for i in (0, 3, 8, 9)]
+    store.remove_rows(np.array([view.index for view in removed]))
+
+    assert store.count == 6
+    assert_consistent(store)
+    for view in removed:
+        assert view.index is None
+    for view in store.views:
+        assert store.health[view.index] == tags[view]
+    assert sorted(store.health[:store.count].tolist()) == [1, 2, 4, 5, 6, 7]
+
+def test_remove_rows_handles_unsorted_duplicates_and_the_tail():
+    store, views = make_store(6)
+    store.remove_rows(np.array([5, 1, 5, 4]))
+    assert store.count == 3
+    assert_consistent(store)
+    assert sorted(store.health[:3].tolist()) == [0, 2, 3]
+
+def test_remove_rows_then_remove_and_extend_reuse_views():
+    store, views = make_store(5)
+    store.remove_rows(np.array([1, 2]))
+    store.remove(store.views[0])
+    assert_consistent(store)
+    assert len(store.spare) == 3
+
+    spare = set(store.spare)
+    added = store.extend(np.array([[400, 60], [500, 60], [600, 60], [700, 60]]))
+    assert_consistent(store)
+    assert len(set(added) & spare) == 3
+    assert store.spare == []
@@ -0,0 +1,45 @@
+import zlib
+import pygame
+import pytest
+from headless import HeadlessRunner
+from policies import greedy_policy
+from replay import (HEADER_V3, MAGIC, Replay, ReplayRecorder, game_data_checksum, read_replay,
+                    replay_session, write_replay)
+
+@pytest.fixture(scope='module')
+def runner():
+    return HeadlessRunner()
+
+@pytest.mark.parametrize('seed, level', [(1, 1), (7, 3)])
+def test_recorded_session_replays_to_the_same_result(runner, tmp_path, seed, level):
+    recorder = ReplayRecorder(str(tmp_path))
+    runner.manager.recorder = recorder
+    runner.start(seed, level)
+    for _ in range(3000):
+        greedy_policy(runner.state, runner.input)
+        if not runner.step():
+            break
+    runner.manager.recorder = None
+    recorded = dict(runner.manager.game_data)
+
+    replay = read_replay(recorder.last_path)
+    assert (replay.seed, replay.level) == (seed, level)
+    assert replay.frame_count > 0
+    assert replay.checksum == game_data_checksum(recorded)
+    assert replay_session(replay, runner) == recorded
+
+def test_version_3_files_read_as_level_1(tmp_path):
+    path = tmp_path / 'old.cfr'
+    checksum = game_data_checksum({'score': 0})
+    path.write_bytes(HEADER_V3.pack(MAGIC, 3, 42, 2, checksum) + zlib.compress(bytes([0x01, 0x02])))
+    replay = read_replay(str(path))
+    assert (replay.seed, replay.frame_count, replay.level) == (42, 2, 1)
+    assert bytes(replay.stream) == bytes([0x01, 0x02])
+
+def test_write_read_round_trip(tmp_path):
+    path = str(tmp_path / 'session.cfr')
+    stream = bytearray([0x01, 0x80 | 0x02, 1, 2, 0x00])
+    write_replay(path, Replay(9, 3, stream, b'\x07' * 32, level=4))
+    replay = read_replay(path)
+    assert (replay.seed, replay.frame_count, replay.level, replay.checksum) == (9, 3, 4, b'\x07' * 32)
+    assert list(replay.frames()) == [((pygame.K_LEFT,), ()), ((pygame.K_RIGHT,), (pygame.K_e,)), ((), ())]
@@ -0,0 +1,66 @@
+import sqlite3
+from settings import *
+import scores
+
+V1_SCHEMA = '''
+CREATE TABLE sessions (
+    id INTEGER PRIMARY KEY,
+    kiosk TEXT NOT NULL,
+    session INTEGER NOT NULL,
+    finished REAL NOT NULL,
+    seed INTEGER,
+    profile TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    time INTEGER NOT NULL,
+    bugs_fixed INTEGER NOT NULL,
+    UNIQUE (kiosk, session)
+);
+CREATE INDEX sessions_score ON sessions (score DESC, finished);
+CREATE INDEX sessions_profile_score ON sessions (profile, score DESC, finished);
+PRAGMA user_version=1;
+'''
+
+def make_v1(path, rows):
+    connection = sqlite3.connect(path)
+    connection.executescript(V1_SCHEMA)
+    connection.executemany('INSERT INTO sessions (kiosk, session, finished, seed, profile, outcome, score, '
+                           'time, bugs_fixed) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+    connection.commit()
+    connection.close()
+
+def test_version_1_database_is_migrated(tmp_path):
+    path = str(tmp_path / 'v1.db')
+    make_v1(path, [('a', 1, 1.0, 5, 'normal', 'complete', 300, 10, 3),
+                   ('a', 2, 2.0, 6, 'normal', 'crashed', 900, 4, 0)])
+    connection = scores.connect(path)
+    assert connection.execute('PRAGMA user_version').fetchone()[0] == scores.SCHEMA_VERSION
+    indexes = {row[1] for row in connection.execute("PRAGMA index_list('sessions')")}
+    assert {'sessions_score', 'sessions_profile_score', 'sessions_level_score'} <= indexes
+
+    # Old sessions predate the campaign and count as level 1
+    rows = scores.leaderboard(connection)
+    assert [(row['score'], row['level']) for row in rows] == [(900, 1), (300, 1)]
+    assert scores.leaderboard(connection, profile='normal', level=1, outcome='complete')[0]['score'] == 300
+
+    # Opening again is a no-op
+    connection.close()
+    scores.connect(path).close()
+
+def test_merge_upgrades_the_other_database_and_is_idempotent(tmp_path):
+    old = str(tmp_path / 'kiosk.db')
+    make_v1(old, [('b', 1, 1.0, 5, 'hard', 'complete', 700, 10, 8)])
+    connection = scores.connect(str(tmp_path / 'main.db'))
+    assert scores.merge(connection, old) == 1
+    assert scores.merge(connection, old) == 0
+    assert scores.leaderboard(connection, profile='hard')[0]['level'] == 1
+
+def test_store_commits_queued_sessions(tmp_path):
+    store = scores.ScoreStore(str(tmp_path / 'scores.db'), kiosk='test')
+    store.add(1, 'normal', 2, LEVEL_COMPLETE, {'score': 500, 'time': 20, 'bugs_fixed': 5})
+    store.add(2, 'normal', 2, GAME_OVER, {'score': 900, 'time': 5, 'bugs_fixed': 1})
+    store.add(3, 'normal', 1, LEVEL_COMPLETE, {'score': 800, 'time': 9, 'bugs_fixed': 4})
+    store.close()
+    assert store.error is None and store.written == 3
+    assert store.best('normal', 2, LEVEL_COMPLETE) == 500
+    assert store.best('normal') == 900
@@ -0,0 +1,59 @@
+import numpy as np
+from telemetry import EVENT_DTYPE, FRAMES, EVENTS, Ring, Telemetry, read_telemetry
+
+def write(ring, values):
+    # Producer side, as Telemetry.event() stores a record
+    frames = ring.fields[1]
+    for value in values:
+        frames[ring.written % ring.capacity] = value
+        ring.written += 1
+
+def test_take_reads_across_the_wrap_point_in_order():
+    ring = Ring(EVENT_DTYPE, 8)
+    write(ring, range(6))
+    records, lost = ring.take()
+    assert records['frame'].tolist() == list(range(6))
+    assert lost == 0
+
+    # Positions 6, 7, then 0-2 of the array
+    write(ring, range(6, 11))
+    records, lost = ring.take()
+    assert records['frame'].tolist() == list(range(6, 11))
+    assert lost == 0
+
+    records, lost = ring.take()
+    assert len(records) == 0 and lost == 0
+
+def test_take_counts_overwritten_records_as_lost():
+    ring = Ring(EVENT_DTYPE, 8)
+    write(ring, range(3))
+    ring.take()
+    write(ring, range(3, 23))
+    records, lost = ring.take()
+    # Only the newest `capacity` records survive
+    assert records['frame'].tolist() == list(range(15, 23))
+    assert lost == 12
+
+def test_files_read_back_what_was_recorded(tmp_path):
+    # Rings large enough that the writer thread can never fall behind
+    telemetry = Telemetry(str(tmp_path), frames=64, events=16)
+    for i in range(40):
+        telemetry.frame(1000 + i, 3, 0, i, 2 * i)
+        if i % 10 == 0:
+            telemetry.scan(i, i // 10)
+    telemetry.close()
+
+    paths = sorted(tmp_path.glob('telemetry-*.cft'))
+    _, frames, events, lost = read_telemetry(str(paths[0]))
+    assert frames['work_ns'].tolist() == [1000 + i for i in range(40)]
+    assert np.array_equal(frames['entities'], frames['particles'] * 2)
+    assert events['a'].tolist() == [0, 1, 2, 3]
+    assert lost[FRAMES] == lost[EVENTS] == 0
+
+def test_stalled_frames_longer_than_int32_are_kept(tmp_path):
+    telemetry = Telemetry(str(tmp_path), frames=8, events=4)
+    telemetry.frame(3_000_000_000, 3, 0, 0, 0)
+    telemetry.close()
+
+    _, frames, _, _ = read_telemetry(str(next(tmp_path.glob('telemetry-*.cft'))))
+    assert frames['work_ns'].tolist() == [3_000_000_000]
@@ -0,0 +1,39 @@
+import threading
+from collections import OrderedDict
+
+# Memoizes rendered text surfaces by (font, text, color, antialias) so static
+# labels are rendered once and dynamic HUD strings only when their value
+# changes. Fonts are looked up by name in the assets['fonts'] dictionary.
+# Returned surfaces are shared; copy one before modifying it for good.
+# SDL_ttf is not thread safe, so rendering is serialized by a lock (the
+# pipelined mode renders text from the simulation and the render thread).
+class TextCache:
+    def __init__(self, fonts, max_entries=512):
+        self.fonts = fonts
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def render(self, font, text, antialias, color):
+        key = (font, text, color, antialias)
+        with self.lock:
+            surface = self.surfaces.get(key)
+            if surface is not None:
+                self.hits += 1
+                self.surfaces.move_to_end(key)
+                return surface
+
+            self.misses += 1
+            surface = self.fonts[font].render(text, antialias, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_entries:
+                self.surfaces.popitem(last=False)
+            return surface
+
+    def clear(self):
+        self.surfaces.clear()